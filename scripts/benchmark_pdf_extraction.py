@@ -0,0 +1,42 @@
+import os
+import sys
+import time
+
+# Add project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from src.ingestion.pdf_loader import extract_pdfs, PAGES_PER_TASK
+
+RAW_POLICY_DIR = "data/raw/policies"
+WORKER_COUNTS = sorted({1, 2, 4, os.cpu_count() or 1})
+
+
+def main():
+    files = sorted(f for f in os.listdir(RAW_POLICY_DIR) if f.endswith(".pdf"))
+    paths = [os.path.join(RAW_POLICY_DIR, f) for f in files]
+
+    print(f"Benchmarking extraction of {len(paths)} PDFs (pages per task: {PAGES_PER_TASK})\n")
+
+    baseline = None
+    baseline_seconds = None
+
+    for workers in WORKER_COUNTS:
+        start = time.perf_counter()
+        pages_by_path, failures = extract_pdfs(paths, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        total_pages = sum(len(pages) for pages in pages_by_path.values())
+        if baseline is None:
+            baseline, baseline_seconds = pages_by_path, elapsed
+
+        identical = pages_by_path == baseline and list(pages_by_path) == list(baseline)
+        print(
+            f"workers={workers:<3} {elapsed:7.2f}s  {total_pages / elapsed:7.1f} pages/s  "
+            f"speedup {baseline_seconds / elapsed:4.2f}x  failures={len(failures)}  "
+            f"identical to serial: {identical}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import os
+import sys
+import glob
+import time
+import numpy as np
+
+# Add project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from src.retrieval.bm25 import tokenize
+from src.retrieval.embedding_backends import get_backend
+from src.retrieval.hybrid import RETRIEVAL_MODES, search_rows
+from src.retrieval.vector_index import read_index_info, load_index_and_metadata, load_lexical_index
+
+INDEX_DIR = "data/processed/vector_index"
+INDEX_FILE = "policy_faiss.index"
+META_FILE = "policy_metadata.bin"
+CLAIMS_DIR = "data/processed/synthetic_claims"
+
+TOP_K = 5
+NUM_CLAIMS = 100
+
+# Exact-term questions that dense retrieval tends to rank poorly
+KEYWORD_QUERIES = [
+    "cataract surgery waiting period",
+    "sub-limit on room rent",
+    "pre-existing disease waiting period",
+    "maternity expenses exclusion",
+    "ambulance charges",
+    "domiciliary hospitalisation",
+    "day care procedures list",
+    "co-payment for senior citizens",
+    "cashless claim settlement turnaround time",
+    "cosmetic surgery exclusion",
+]
+
+
+def load_queries():
+    queries = list(KEYWORD_QUERIES)
+    for path in sorted(glob.glob(os.path.join(CLAIMS_DIR, "synthetic_claim_*.txt")))[:NUM_CLAIMS]:
+        with open(path, "r", encoding="utf-8") as f:
+            queries.append(f.read())
+    return queries
+
+
+def keyword_coverage(queries, results, metadata):
+    """Share of retrieved chunks (keyword queries only) containing every query term."""
+    hits, total = 0, 0
+    for query, rows in zip(queries, results):
+        if query not in KEYWORD_QUERIES:
+            continue
+        terms = set(tokenize(query))
+        for row in rows:
+            hits += terms <= set(tokenize(metadata[row]["text"]))
+            total += 1
+    return hits / max(total, 1)
+
+
+def main():
+    backend = get_backend()
+    info = read_index_info(INDEX_DIR)
+    index, metadata = load_index_and_metadata(INDEX_DIR, INDEX_FILE, META_FILE, backend, info)
+    lexical = load_lexical_index(INDEX_DIR, info)
+    if lexical is None:
+        raise SystemExit("Index has no BM25 index; rebuild with scripts/build_policy_vector_index.py")
+
+    queries = load_queries()
+    query_vectors = np.asarray(backend.embed(queries), dtype="float32")
+
+    print(f"{len(queries)} queries over {len(metadata)} chunks, top-{TOP_K} (query embedding not timed)\n")
+
+    # BM25 alone, for reference
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        lexical.search(query, TOP_K)
+        latencies.append((time.perf_counter() - start) * 1000)
+    print(f"{'bm25 only':<10} p50 {np.percentile(latencies, 50):7.3f}ms  p99 {np.percentile(latencies, 99):7.3f}ms")
+
+    baseline = None
+    for mode in RETRIEVAL_MODES:
+        latencies = []
+        results = []
+        for query, vector in zip(queries, query_vectors):
+            start = time.perf_counter()
+            results.extend(search_rows(index, vector[None, :], TOP_K, None, lexical, [query], mode))
+            latencies.append((time.perf_counter() - start) * 1000)
+
+        if baseline is None:
+            baseline = results
+        overlap = np.mean([len(set(r) & set(b)) / TOP_K for r, b in zip(results, baseline)])
+
+        print(
+            f"{mode:<10} p50 {np.percentile(latencies, 50):7.3f}ms  p99 {np.percentile(latencies, 99):7.3f}ms  "
+            f"overlap with vector {overlap:.2f}  "
+            f"keyword coverage {keyword_coverage(queries, results, metadata):.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import os
+import sys
+import glob
+import random
+import time
+import faiss
+import numpy as np
+
+# Add project root to Python path
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from src.retrieval.metadata_store import MetadataStore
+from src.retrieval.embedding_backends import get_backend
+from src.retrieval.vector_index import (
+    INDEX_TYPES,
+    STORAGE_TYPES,
+    read_index_info,
+    committed_files,
+    check_embedding_backend,
+    base_index,
+    build_index,
+    normalize_vectors
+)
+
+INDEX_DIR = "data/processed/vector_index"
+INDEX_FILE = "policy_faiss.index"
+META_FILE = "policy_metadata.bin"
+CLAIMS_DIR = "data/processed/synthetic_claims"
+
+TOP_K = 5
+NUM_QUERIES = 200
+
+# Extra configurations on top of each type's defaults, e.g.
+# ("ivf_flat", {"nprobe": 4}) to see the recall/latency trade-off
+EXTRA_CONFIGS = [
+    ("ivf_flat", {"nprobe": 4}),
+    ("hnsw", {"ef_search": 16}),
+]
+
+# Scalar-quantized storage must keep this share of the float32
+# inner-product top-5 (averaged over the queries)
+QUANTIZED_TOP_K_TOLERANCE = {
+    "fp16": 0.99,
+    "int8": 0.95,
+}
+
+
+def load_vectors():
+    """
+    Exact vectors of the built index. Needs a flat (or HNSW-flat) index;
+    PQ codes only reconstruct approximately.
+    """
+    info = read_index_info(INDEX_DIR)
+    index_type = info.get("index", {}).get("type", "flat")
+    storage = info.get("index", {}).get("params", {}).get("storage", "float32")
+    if index_type not in ("flat", "hnsw") or storage != "float32":
+        raise ValueError(
+            f"Benchmark needs exact stored vectors; rebuild with INDEX_TYPE='flat' "
+            f"(found {index_type!r}, storage {storage!r})"
+        )
+
+    index_file, _ = committed_files(info, INDEX_FILE, META_FILE)
+    index = faiss.read_index(os.path.join(INDEX_DIR, index_file))
+    return info, base_index(index).reconstruct_n(0, index.ntotal)
+
+
+def load_query_texts(metadata):
+    claim_files = sorted(glob.glob(os.path.join(CLAIMS_DIR, "synthetic_claim_*.txt")))
+    if claim_files:
+        texts = []
+        for path in claim_files[:NUM_QUERIES]:
+            with open(path, "r", encoding="utf-8") as f:
+                texts.append(f.read())
+        return texts
+
+    # No synthetic claims yet: use a sample of the chunks themselves
+    rows = random.Random(0).sample(range(len(metadata)), min(NUM_QUERIES, len(metadata)))
+    return [metadata[i]["text"] for i in rows]
+
+
+def recall_at_k(found, expected):
+    hits = sum(len(set(f[f >= 0]) & set(e)) for f, e in zip(found, expected))
+    return hits / expected.size
+
+
+def search_all(index, queries, metric):
+    if metric == "ip":
+        queries = normalize_vectors(queries)
+    _, indices = index.search(queries, TOP_K)
+    return indices
+
+
+def check_quantized_storage(vectors, queries):
+    """
+    Compares fp16/int8 flat inner-product indexes to the float32 one.
+    Returns True when every storage type is within its tolerance.
+    """
+    baseline, _ = build_index(vectors, "flat", {"metric": "ip"})
+    expected = search_all(baseline, queries, "ip")
+    baseline_mb = faiss.serialize_index(baseline).nbytes / 1e6
+
+    print(f"\nScalar-quantized storage vs float32 inner product (top-{TOP_K} overlap):")
+    passed = True
+    for storage, tolerance in QUANTIZED_TOP_K_TOLERANCE.items():
+        index, _ = build_index(vectors, "flat", {"metric": "ip", "storage": storage})
+        overlap = recall_at_k(search_all(index, queries, "ip"), expected)
+        memory_mb = faiss.serialize_index(index).nbytes / 1e6
+        ok = overlap >= tolerance
+        passed = passed and ok
+        print(
+            f"  {storage:<5} overlap {overlap:.3f} (tolerance {tolerance:.2f}) {'OK' if ok else 'FAIL'}  "
+            f"size {memory_mb:.2f} MB ({baseline_mb / memory_mb:.1f}x smaller)"
+        )
+    return passed
+
+
+def main():
+    backend = get_backend()
+    info, vectors = load_vectors()
+    check_embedding_backend(info, backend)
+
+    _, meta_file = committed_files(info, INDEX_FILE, META_FILE)
+    metadata = MetadataStore(os.path.join(INDEX_DIR, meta_file))
+    queries = np.asarray(backend.embed(load_query_texts(metadata)), dtype="float32")
+    metadata.close()
+
+    print(f"Benchmarking {vectors.shape[0]} vectors (dim {vectors.shape[1]}), {len(queries)} queries, top-{TOP_K}\n")
+
+    configs = [(index_type, {}) for index_type in INDEX_TYPES] + EXTRA_CONFIGS
+    configs += [("flat", {"metric": "ip", "storage": storage}) for storage in STORAGE_TYPES]
+    configs += [("hnsw", {"metric": "ip", "storage": "int8"})]
+    ground_truth = None
+
+    for index_type, params in configs:
+        start = time.perf_counter()
+        index, resolved = build_index(vectors, index_type, params)
+        build_seconds = time.perf_counter() - start
+
+        memory_mb = faiss.serialize_index(index).nbytes / 1e6
+
+        # Single-query latency, as seen by retrieve_clauses
+        latencies = []
+        found = []
+        for query in queries:
+            start = time.perf_counter()
+            indices = search_all(index, query[None, :], resolved["metric"])
+            latencies.append((time.perf_counter() - start) * 1000)
+            found.append(indices[0])
+        found = np.array(found)
+
+        if ground_truth is None:
+            ground_truth = found
+
+        print(
+            f"{index_type:<9} {str(resolved):<90} "
+            f"recall@{TOP_K} {recall_at_k(found, ground_truth):.3f}  "
+            f"p50 {np.percentile(latencies, 50):6.3f}ms  p99 {np.percentile(latencies, 99):6.3f}ms  "
+            f"build {build_seconds:6.2f}s  size {memory_mb:7.2f} MB"
+        )
+
+    if not check_quantized_storage(vectors, queries):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
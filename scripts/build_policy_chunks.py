@@ -1,48 +1,106 @@
 import os
-import json
 import sys
 
 # Add project root to Python path
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
-from src.ingestion.pdf_loader import load_all_policies
-from src.utils.text_cleaning import clean_text
-from src.ingestion.chunker import chunk_text
+from src.ingestion.pipeline import (
+    iter_document_pages,
+    iter_cleaned_documents,
+    iter_document_chunks
+)
+from src.ingestion.manifest import (
+    load_manifest,
+    save_manifest,
+    describe_file,
+    diff_documents
+)
+from src.utils.file_utils import iter_jsonl, JsonlWriter
 
 RAW_POLICY_DIR = "data/raw/policies"
 OUTPUT_DIR = "data/processed/policy_chunks"
-OUTPUT_FILE = "policy_chunks.json"
+OUTPUT_FILE = "policy_chunks.jsonl"
+MANIFEST_FILE = "ingestion_manifest.json"
+
+# Recorded in the manifest: changing these forces a full re-chunk.
+# "tokens" mode: budgeted by tiktoken, cut at sentence/clause boundaries.
+# "characters" mode: {"mode": "characters", "chunk_size": 800, "overlap": 150}
+CHUNKER_SETTINGS = {
+    "mode": "tokens",
+    "max_tokens": 200,
+    "overlap_tokens": 40,
+    "min_tokens": 100
+}
+
+# PDF extraction process pool (1 = serial)
+EXTRACTION_WORKERS = os.cpu_count() or 1
+
+
+def iter_previous_chunks(output_path, source_files):
+    """Streams chunks of the given source files from the previous chunk file."""
+    if not source_files or not os.path.exists(output_path):
+        return
+    for chunk in iter_jsonl(output_path):
+        if chunk["source_file"] in source_files:
+            yield chunk
 
 
 def main():
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    print("Loading policy PDFs...")
-    policies = load_all_policies(RAW_POLICY_DIR)
+    output_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE)
+    manifest_path = os.path.join(OUTPUT_DIR, MANIFEST_FILE)
 
-    processed_documents = []
+    manifest = load_manifest(manifest_path, CHUNKER_SETTINGS)
 
-    for filename, text in policies.items():
-        if not text or len(text.strip()) == 0:
-            continue
+    # Without the previous chunk file nothing can be reused
+    if not os.path.exists(output_path):
+        manifest["documents"] = {}
 
-        cleaned_text = clean_text(text)
-        chunks = chunk_text(cleaned_text)
+    changes = diff_documents(RAW_POLICY_DIR, manifest)
+    to_process = changes["added"] + changes["modified"]
 
-        for idx, chunk in enumerate(chunks):
-            processed_documents.append({
-                "source_file": filename,
-                "chunk_id": idx,
-                "text": chunk
-            })
+    print(
+        f"Policy PDFs: {len(changes['added'])} added, {len(changes['modified'])} modified, "
+        f"{len(changes['unchanged'])} unchanged, {len(changes['removed'])} removed"
+    )
 
-    output_path = os.path.join(OUTPUT_DIR, OUTPUT_FILE)
+    for filename in changes["removed"]:
+        del manifest["documents"][filename]
+
+    paths = [os.path.join(RAW_POLICY_DIR, filename) for filename in to_process]
+    failures = {}
+
+    # The new chunk file is streamed to a temp file and swapped in at the end:
+    # 1. chunks of unchanged documents, copied as-is so their chunk_uids stay stable
+    # 2. chunks of added / modified documents, one document at a time
+    # 3. previous chunks of modified documents whose re-extraction failed
+    with JsonlWriter(output_path) as writer:
+        writer.write_many(iter_previous_chunks(output_path, set(changes["unchanged"])))
+
+        documents = iter_cleaned_documents(iter_document_pages(paths, EXTRACTION_WORKERS, failures))
+        for document in documents:
+            filename = document.doc_id
+            print(f"Processing {filename}...")
+            chunk_uids = []
+            for chunk in iter_document_chunks(document, CHUNKER_SETTINGS):
+                writer.write(chunk)
+                chunk_uids.append(chunk["chunk_uid"])
+
+            manifest["documents"][filename] = {
+                **describe_file(os.path.join(RAW_POLICY_DIR, filename)),
+                "chunk_uids": chunk_uids
+            }
+
+        # Failed documents are left out of the manifest update so the next run retries them
+        for filename, error in failures.items():
+            print(f"Failed to extract {filename}: {error}")
+        writer.write_many(iter_previous_chunks(output_path, set(failures) & set(changes["modified"])))
 
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(processed_documents, f, indent=2, ensure_ascii=False)
+    save_manifest(manifest, manifest_path)
 
-    print(f"Saved {len(processed_documents)} chunks to {output_path}")
+    print(f"Saved {writer.count} chunks to {output_path}")
 
 
 if __name__ == "__main__":
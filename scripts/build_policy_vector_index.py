@@ -1,6 +1,7 @@
 import os
 import sys
-import json
+import time
+from collections import Counter
 import openai
 import faiss
 import numpy as np
@@ -9,64 +10,264 @@ import numpy as np
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
+from src.retrieval.embedding_cache import EmbeddingCache
+from src.retrieval.embedding_client import AsyncEmbeddingClient
+from src.retrieval.batching import (
+    batch_by_tokens,
+    iter_record_batches,
+    plan_embedding_inputs,
+    combine_pieces
+)
+from src.utils.file_utils import iter_jsonl
+from src.retrieval.metadata_store import MetadataStoreWriter
+from src.retrieval.bm25 import BM25IndexWriter
+from src.ingestion.dedup import find_near_duplicates, iter_canonical_chunks
+from src.retrieval.embedding_backends import get_backend
+from src.retrieval.vector_index import (
+    build_index,
+    base_index,
+    next_generation,
+    commit_generation
+)
+
 # -----------------------------
 # CONFIG
 # -----------------------------
-CHUNKS_PATH = "data/processed/policy_chunks/policy_chunks.json"
+CHUNKS_PATH = "data/processed/policy_chunks/policy_chunks.jsonl"
 INDEX_DIR = "data/processed/vector_index"
 INDEX_FILE = "policy_faiss.index"
-META_FILE = "policy_metadata.json"
+META_FILE = "policy_metadata.bin"
+
+# BM25 inverted index over the same chunks, for hybrid/prefiltered retrieval
+LEXICAL_FILE = "policy_bm25.bin"
+
+# Embedding requests are packed by tiktoken-measured tokens, not item count.
+# API limits: 8191 tokens per input, 300k tokens and 2048 inputs per request.
+EMBED_BATCH_MAX_TOKENS = 50_000
+EMBED_BATCH_MAX_ITEMS = 2048
+EMBED_MAX_INPUT_TOKENS = 8_000
+EMBED_ON_OVERSIZED = "split"   # "split" (token-weighted mean of pieces) or "reject"
+
+# Requests kept in flight at once; chunks are streamed through
+# EMBED_BATCH_MAX_TOKENS * EMBED_CONCURRENCY tokens at a time.
+EMBED_CONCURRENCY = 4
+
+# Account limits for the embedding model; retries back off on 429 / 5xx
+EMBED_REQUESTS_PER_MINUTE = 3000
+EMBED_TOKENS_PER_MINUTE = 1_000_000
+EMBED_MAX_RETRIES = 6
+
+# Near-duplicate chunks (shared IRDAI boilerplate etc.) collapse into one
+# canonical chunk when their estimated Jaccard similarity reaches this
+# and their figures (amounts, percentages, periods) are identical
+DEDUP_ENABLED = True
+DEDUP_THRESHOLD = 0.8
+
+# Content-addressed embedding cache: rebuilds only embed new/changed chunks
+EMBEDDING_CACHE_PATH = "data/processed/vector_index/embedding_cache.sqlite"
+EMBEDDING_CACHE_MAX_BYTES = 512 * 1024 * 1024
+
+# Embedding backend is selected with the EMBEDDING_BACKEND env var
+# ("openai" by default, "hashing" for the offline CPU embedder) and is
+# recorded in index_info.json so queries must use the same one.
 
-EMBEDDING_MODEL = "text-embedding-3-small"
+# "flat" (exact), "ivf_flat", "ivf_pq" or "hnsw"; see
+# src/retrieval/vector_index.py for the defaults. Search-time params
+# (nprobe, ef_search) are stored in index_info.json and applied on load.
+# INDEX_PARAMS can also pick {"metric": "ip"} (normalized inner product,
+# i.e. cosine) and {"storage": "fp16" | "int8"} scalar-quantized vectors.
+# scripts/benchmark_vector_indexes.py compares recall/latency/memory.
+INDEX_TYPE = "flat"
+INDEX_PARAMS = {}
 
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
 # -----------------------------
-def load_chunks():
-    with open(CHUNKS_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
+def iter_chunks():
+    return iter_jsonl(CHUNKS_PATH)
+
 
 # -----------------------------
-def embed_texts(texts, batch_size=100):
-    all_embeddings = []
+def embed_texts(texts, backend, cache=None, embedder=None, token_counts=None,
+                max_batch_tokens=EMBED_BATCH_MAX_TOKENS):
+    # Local backends are cheap enough to run directly
+    if not backend.is_remote:
+        return list(backend.embed(texts))
 
-    for i in range(0, len(texts), batch_size):
-        batch = texts[i:i + batch_size]
-        print(f"Embedding batch {i // batch_size + 1} / {(len(texts) // batch_size) + 1}")
+    all_embeddings = [None] * len(texts)
 
-        response = openai.embeddings.create(
-            model=EMBEDDING_MODEL,
-            input=batch
-        )
+    if cache is not None:
+        all_embeddings = cache.get_many(backend.cache_key, texts)
+
+    missing = [i for i, e in enumerate(all_embeddings) if e is None]
+
+    if embedder is None:
+        embedder = AsyncEmbeddingClient(backend.model, cache=cache)
+    embedder.stats.cached += len(texts) - len(missing)
+
+    if not missing:
+        return all_embeddings
+
+    # Oversized inputs are split (or rejected) before anything is sent
+    missing_texts = [texts[p] for p in missing]
+    missing_tokens = [token_counts[p] for p in missing] if token_counts is not None else None
+    pieces, owners, piece_tokens = plan_embedding_inputs(
+        missing_texts, EMBED_MAX_INPUT_TOKENS, EMBED_ON_OVERSIZED, missing_tokens
+    )
+
+    # Concurrent, rate-limited, token-packed requests; each finished batch is
+    # cached immediately so an interrupted rebuild resumes from the last completed batch
+    batches = batch_by_tokens(pieces, max_batch_tokens, EMBED_BATCH_MAX_ITEMS, piece_tokens)
+    batch_embeddings = embedder.embed_batches_sync(
+        [[pieces[i] for i in batch] for batch in batches],
+        [sum(piece_tokens[i] for i in batch) for batch in batches]
+    )
+
+    piece_embeddings = [None] * len(pieces)
+    for batch, embeddings in zip(batches, batch_embeddings):
+        for i, embedding in zip(batch, embeddings):
+            piece_embeddings[i] = embedding
 
-        batch_embeddings = [item.embedding for item in response.data]
-        all_embeddings.extend(batch_embeddings)
+    combined = combine_pieces(piece_embeddings, owners, piece_tokens, len(missing))
+    for p, embedding in zip(missing, combined):
+        all_embeddings[p] = embedding
+
+    # Split inputs are cached under their full text, like every other chunk
+    split_owners = [o for o, count in sorted(Counter(owners).items()) if count > 1]
+    if cache is not None and split_owners:
+        cache.put_many(backend.cache_key, [missing_texts[o] for o in split_owners], [combined[o] for o in split_owners])
 
     return all_embeddings
 
 
+# -----------------------------
+def iter_index_chunks(dedup_stats=None):
+    """
+    Chunks as they go into the index: near-duplicates collapsed into their
+    canonical chunk when DEDUP_ENABLED. Returns (chunks, total_chunks);
+    total_chunks is only known (and only needed) with dedup.
+    """
+    if not DEDUP_ENABLED:
+        return iter_chunks(), None
+
+    print(f"Detecting near-duplicate chunks (threshold {DEDUP_THRESHOLD})...")
+    canonical_of, source_files = find_near_duplicates(iter_chunks(), DEDUP_THRESHOLD)
+    total_chunks = len(canonical_of) + len(source_files)
+
+    cross_policy = sum(1 for files in source_files.values() if len(files) > 1)
+    print(
+        f"Dedup: {total_chunks} chunks -> {len(source_files)} canonical "
+        f"({len(canonical_of)} duplicates removed, {len(canonical_of) / max(total_chunks, 1):.1%}; "
+        f"{cross_policy} canonical chunks shared across policies)"
+    )
+    return iter_canonical_chunks(iter_chunks(), canonical_of, source_files, dedup_stats), total_chunks
+
+
+# -----------------------------
+def create_embedder(backend, cache):
+    return AsyncEmbeddingClient(
+        getattr(backend, "model", backend.cache_key),
+        max_concurrency=EMBED_CONCURRENCY,
+        requests_per_minute=EMBED_REQUESTS_PER_MINUTE,
+        tokens_per_minute=EMBED_TOKENS_PER_MINUTE,
+        max_retries=EMBED_MAX_RETRIES,
+        cache=cache
+    )
+
+
 # -----------------------------
 def main():
     os.makedirs(INDEX_DIR, exist_ok=True)
 
-    print("Loading policy chunks...")
-    chunks = load_chunks()
+    dedup_stats = {}
+    chunks, total_chunks = iter_index_chunks(dedup_stats)
+
+    backend = get_backend()
+    print(f"Streaming policy chunks into the index (embedding backend: {backend.identity()})...")
+    cache = EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_BYTES)
+    embedder = create_embedder(backend, cache)
+    index = None
+
+    # A full build is written as a new generation and only becomes visible
+    # when index_info.json is committed at the end
+    generation, files = next_generation(INDEX_DIR, {
+        "index": INDEX_FILE,
+        "metadata": META_FILE,
+        "lexical": LEXICAL_FILE
+    })
+
+    # Chunks flow through in windows: embed, add to the index, append to
+    # the metadata file and the BM25 postings. Only the index itself grows.
+    # Vectors are keyed by chunk_uid so scripts/update_policy_vector_index.py
+    # can add and remove chunks later without a rebuild.
+    with MetadataStoreWriter(os.path.join(INDEX_DIR, files["metadata"])) as metadata_writer, \
+            BM25IndexWriter(os.path.join(INDEX_DIR, files["lexical"])) as lexical_writer:
+        window_tokens = EMBED_BATCH_MAX_TOKENS * EMBED_CONCURRENCY
+        window_items = EMBED_BATCH_MAX_ITEMS * EMBED_CONCURRENCY
+        for batch in iter_record_batches(chunks, window_tokens, window_items):
+            texts = [c["text"] for c in batch]
+            token_counts = [c.get("token_count") for c in batch]
+            embeddings = embed_texts(
+                texts,
+                backend,
+                cache=cache,
+                embedder=embedder,
+                token_counts=token_counts if None not in token_counts else None
+            )
 
-    texts = [c["text"] for c in chunks]
+            vectors = np.array(embeddings).astype("float32")
+            if index is None:
+                index = faiss.IndexIDMap2(faiss.IndexFlatL2(vectors.shape[1]))
+            index.add_with_ids(vectors, np.array([c["chunk_uid"] for c in batch], dtype="int64"))
 
-    print(f"Generating embeddings for {len(texts)} chunks...")
-    embeddings = embed_texts(texts)
+            metadata_writer.write_many(batch)
+            lexical_writer.add_many(texts)
 
-    vectors = np.array(embeddings).astype("float32")
-    dim = vectors.shape[1]
+        if index is None:
+            raise ValueError(f"No chunks found in {CHUNKS_PATH}")
 
-    index = faiss.IndexFlatL2(dim)
-    index.add(vectors)
+    # Approximate indexes need every vector up front for training, so the
+    # flat index above doubles as the staging area
+    index_params = {}
+    if INDEX_TYPE != "flat" or INDEX_PARAMS:
+        start = time.perf_counter()
+        vectors = base_index(index).reconstruct_n(0, index.ntotal)
+        ids = faiss.vector_to_array(index.id_map)
+        index, index_params = build_index(vectors, INDEX_TYPE, INDEX_PARAMS, ids)
+        print(f"Built {INDEX_TYPE} index {index_params} in {time.perf_counter() - start:.1f}s")
+
+    print(f"Indexed {index.ntotal} chunks")
+    if backend.is_remote:
+        print(f"Embedding client: {embedder.stats.summary()}")
+
+    if total_chunks is not None:
+        removed = total_chunks - index.ntotal
+        bytes_per_vector = index.d * 4
+        print(
+            f"Dedup savings: {removed} fewer vectors "
+            f"({removed * bytes_per_vector / 1e6:.2f} MB of {total_chunks * bytes_per_vector / 1e6:.2f} MB index), "
+            f"{removed} fewer texts / {dedup_stats.get('skipped_tokens', 0)} fewer tokens to embed "
+            f"(~{dedup_stats.get('skipped_tokens', 0) / EMBED_BATCH_MAX_TOKENS:.1f} requests' worth)"
+        )
 
-    faiss.write_index(index, os.path.join(INDEX_DIR, INDEX_FILE))
+    evicted = cache.evict()
+    stats = cache.stats()
+    print(
+        f"Embedding cache: hit rate {stats['hit_rate']:.1%} "
+        f"({stats['hits']} hits / {stats['misses']} misses), "
+        f"{stats['entries']} entries, {stats['size_bytes'] / 1e6:.1f} MB, {evicted} evicted"
+    )
+    cache.close()
 
-    with open(os.path.join(INDEX_DIR, META_FILE), "w", encoding="utf-8") as f:
-        json.dump(chunks, f, indent=2)
+    faiss.write_index(index, os.path.join(INDEX_DIR, files["index"]))
+    commit_generation(INDEX_DIR, {
+        "embedding": backend.identity(),
+        "index": {"type": INDEX_TYPE, "params": index_params, "id_map": True},
+        "dim": index.d,
+        "ntotal": index.ntotal,
+        "generation": generation,
+        "files": files
+    })
 
     print("FAISS index and metadata saved successfully.")
 
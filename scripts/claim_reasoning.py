@@ -1,7 +1,7 @@
 import os
 import sys
-import json
-import faiss
+import threading
+from collections import Counter, defaultdict
 import numpy as np
 import openai
 
@@ -11,47 +11,142 @@ import openai
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
+from src.retrieval.embedding_backends import get_backend
+from src.retrieval.insurers import detect_insurer, insurer_source_files
+from src.retrieval.hybrid import search_rows
+from src.retrieval.scheduler import MicroBatchScheduler
+from src.reasoning.response_cache import ResponseCache, cached_chat_completion, create_chat_completion
+from src.reasoning.context_assembly import ContextStats, assemble_context, render_context
+from src.utils.tokens import get_model_encoding
+from src.reasoning.streaming import (
+    IncrementalJSONParser,
+    OffSchemaOutput,
+    StreamStats,
+    stream_chat_completion
+)
+from src.retrieval.vector_index import (
+    INDEX_INFO_FILE,
+    read_index_info,
+    committed_files,
+    load_index_and_metadata as load_committed_index,
+    load_lexical_index
+)
+
 INDEX_DIR = "data/processed/vector_index"
 INDEX_FILE = "policy_faiss.index"
-META_FILE = "policy_metadata.json"
+META_FILE = "policy_metadata.bin"
 
-EMBEDDING_MODEL = "text-embedding-3-small"
+# Embedding backend/model come from src.retrieval.embedding_backends
+# (EMBEDDING_BACKEND env var); the index records which one built it.
 LLM_MODEL = "gpt-4o-mini"   # cost-efficient, reasoning-capable
 TOP_K = 5
 
+# Search only the policy documents of the insurer/scheme a claim names
+# (src/retrieval/insurers.py), instead of the whole corpus
+INSURER_SHARDING = True
+
+# "vector", "hybrid" (dense + BM25 fused with reciprocal rank fusion) or
+# "prefilter" (BM25 candidates, re-ranked by FAISS). Falls back to
+# "vector" for index generations built without a BM25 index. Vector stays
+# the default; opt in per reasoner (ClaimReasoner(retrieval_mode=...))
+# after comparing modes with scripts/benchmark_retrieval_modes.py.
+RETRIEVAL_MODE = "vector"
+
+# Concurrent ClaimReasoner.retrieve() calls arriving within the window are
+# coalesced into one embedding request and one matrix search
+MICRO_BATCHING = True
+RETRIEVAL_BATCH_WINDOW_MS = 5
+RETRIEVAL_MAX_BATCH_SIZE = 64
+
+# Retrieved clauses are merged where neighbouring chunks of one file
+# overlap, then cut to fit this many LLM_MODEL tokens (None: merge only)
+CONTEXT_TOKEN_BUDGET = 1200
+
+# Stream completions and parse the JSON as it arrives: coverage_decision
+# is available before the answer finishes, and output that goes
+# off-schema (markdown fences, prose, malformed JSON) is abandoned and
+# retried instead of being read to the end
+LLM_STREAMING = True
+LLM_STREAM_MAX_ATTEMPTS = 2
+
+# On-disk cache of LLM answers keyed by model, temperature, response_format
+# and the full prompt, so regression re-runs only pay for changed prompts.
+# LLM_CACHE_BYPASS=1 forces fresh calls (the answers are still stored).
+LLM_CACHE_ENABLED = True
+LLM_CACHE_PATH = "data/processed/llm_cache/responses.sqlite"
+LLM_CACHE_TTL_SECONDS = 30 * 24 * 3600
+LLM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+LLM_CACHE_BYPASS = os.getenv("LLM_CACHE_BYPASS") == "1"
+
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
 # -------------------------------------------------
-def load_index_and_metadata():
-    index = faiss.read_index(os.path.join(INDEX_DIR, INDEX_FILE))
-    with open(os.path.join(INDEX_DIR, META_FILE), "r", encoding="utf-8") as f:
-        metadata = json.load(f)
-    return index, metadata
+def load_index_and_metadata(backend=None):
+    return load_committed_index(INDEX_DIR, INDEX_FILE, META_FILE, backend or get_backend())
 
 # -------------------------------------------------
-def embed_query(query):
-    response = openai.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=query
-    )
-    return np.array(response.data[0].embedding).astype("float32")
+def index_fingerprint(index_dir=INDEX_DIR):
+    """
+    (mtime_ns, size) of the index and metadata files, used to detect
+    that a rebuild happened underneath a long-running process.
+    """
+    # Builds commit by replacing index_info.json, which names the files
+    # of the current generation
+    fingerprint = []
+    info = read_index_info(index_dir)
+    names = info.get("files") or dict(zip(("index", "metadata"), committed_files(info, INDEX_FILE, META_FILE)))
+    for name in (INDEX_INFO_FILE, *names.values()):
+        path = os.path.join(index_dir, name)
+        if not os.path.exists(path):
+            fingerprint.append(None)
+            continue
+        stat = os.stat(path)
+        fingerprint.append((stat.st_mtime_ns, stat.st_size))
+    return tuple(fingerprint)
 
 # -------------------------------------------------
-def retrieve_clauses(query, index, metadata):
-    query_vector = embed_query(query)
-    distances, indices = index.search(np.array([query_vector]), TOP_K)
+def embed_query(query, backend=None):
+    backend = backend or get_backend()
+    return backend.embed_query(query)
 
-    retrieved = []
-    for idx in indices[0]:
-        retrieved.append(metadata[idx])
+# -------------------------------------------------
+def retrieve_clauses(query, index, metadata, backend=None, rows=None, lexical=None, mode=RETRIEVAL_MODE):
+    """
+    Top-K clauses for a query. rows restricts the search to those metadata
+    rows (an insurer's shard); if nothing is found there, the whole corpus
+    is searched instead. With a BM25 index, mode picks vector, hybrid (RRF)
+    or BM25-prefiltered retrieval (src/retrieval/hybrid.py).
+    """
+    query_vector = embed_query(query, backend)
+    found = search_rows(index, np.array([query_vector]), TOP_K, rows, lexical, [query], mode)
+    return [metadata[idx] for idx in found[0]]
+
+# -------------------------------------------------
+def embed_queries(queries, backend=None):
+    """
+    Embeds many queries (token-budgeted batches for API backends) and
+    returns a (len(queries), dim) float32 matrix in input order.
+    """
+    backend = backend or get_backend()
+    return backend.embed(queries)
 
-    return retrieved
+# -------------------------------------------------
+def retrieve_clauses_bulk(queries, index, metadata, backend=None, rows=None, lexical=None, mode=RETRIEVAL_MODE):
+    """
+    Bulk counterpart of retrieve_clauses: one embedding call per token
+    budget and a single index.search over the stacked query matrix.
+    Returns one clause list per query, in input order.
+    """
+    if not queries:
+        return []
+
+    query_vectors = embed_queries(queries, backend)
+    found = search_rows(index, query_vectors, TOP_K, rows, lexical, queries, mode)
+    return [[metadata[idx] for idx in row] for row in found]
 
 # -------------------------------------------------
 def build_prompt(query, clauses):
-    context = ""
-    for i, c in enumerate(clauses, start=1):
-        context += f"\nClause {i} (Source: {c['source_file']}):\n{c['text']}\n"
+    context = render_context(clauses)
 
     prompt = f"""
 You are a healthcare insurance policy expert.
@@ -88,19 +183,223 @@ Respond in the following JSON format ONLY:
     return prompt
 
 # -------------------------------------------------
-def run_reasoning(query):
-    index, metadata = load_index_and_metadata()
-    clauses = retrieve_clauses(query, index, metadata)
-    prompt = build_prompt(query, clauses)
-
-    response = openai.chat.completions.create(
-        model=LLM_MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2,
-        response_format={"type": "json_object"}
-    )
-
-    return response.choices[0].message.content
+class ClaimReasoner:
+    """
+    Warm reasoning session: owns the FAISS index, the chunk metadata,
+    the OpenAI client and the query embedding backend, so they are loaded
+    once per process instead of once per claim.
+
+    With auto_reload=True every call stats the index files and reloads
+    them if a rebuild replaced them; reload_if_changed() can also be
+    called explicitly.
+
+    With insurer_sharding=True, claims that name an insurer or scheme are
+    searched only against that insurer's policy documents (falling back
+    to the whole corpus when the shard is unknown or has no hits).
+    retrieval_mode selects vector, hybrid or BM25-prefiltered retrieval.
+
+    With micro_batching=True, retrieve() calls from concurrent threads go
+    through a MicroBatchScheduler and are served by retrieve_many();
+    scheduler.stats has the batch-size and queue-depth metrics.
+
+    LLM answers go through response_cache (the shared on-disk cache by
+    default; pass response_cache=False to disable it).
+
+    Prompts carry the clauses as assembled by assemble_context() under
+    context_token_budget; context_stats totals the tokens saved.
+
+    With streaming=True answers are streamed and parsed incrementally;
+    reason(..., on_field=fn) gets fn(name, value) per completed field and
+    stream_stats has time-to-decision and aborted-stream metrics. An
+    answer still off-schema after LLM_STREAM_MAX_ATTEMPTS comes back as
+    None (a schema failure for the caller).
+    """
+
+    def __init__(self, index_dir=INDEX_DIR, client=None, auto_reload=True, backend=None,
+                 insurer_sharding=INSURER_SHARDING, retrieval_mode=RETRIEVAL_MODE,
+                 micro_batching=MICRO_BATCHING, response_cache=None,
+                 context_token_budget=CONTEXT_TOKEN_BUDGET, streaming=LLM_STREAMING):
+        self.index_dir = index_dir
+        self.client = client if client is not None else openai
+        self.backend = backend if backend is not None else get_backend(client=self.client)
+        self.auto_reload = auto_reload
+        self.insurer_sharding = insurer_sharding
+        self.retrieval_mode = retrieval_mode
+        if response_cache is None:
+            response_cache = get_response_cache()
+        # Not `or None`: an empty ResponseCache is falsy (it has __len__)
+        self.response_cache = None if response_cache is False else response_cache
+        self.context_token_budget = context_token_budget
+        self.context_stats = ContextStats()
+        self.streaming = streaming
+        self.stream_stats = StreamStats()
+
+        self.index_info = None
+        self.index = None
+        self.metadata = None
+        self.lexical = None
+        self.fingerprint = None
+        self.shards = {}
+        self.shard_stats = Counter()
+        self._lock = threading.Lock()
+
+        self.load()
+
+        self.scheduler = None
+        if micro_batching:
+            self.scheduler = MicroBatchScheduler(
+                self.retrieve_many,
+                window_ms=RETRIEVAL_BATCH_WINDOW_MS,
+                max_batch_size=RETRIEVAL_MAX_BATCH_SIZE
+            )
+
+    def load(self):
+        with self._lock:
+            fingerprint = index_fingerprint(self.index_dir)
+            index_info = read_index_info(self.index_dir)
+            index, metadata = load_committed_index(self.index_dir, INDEX_FILE, META_FILE, self.backend, index_info)
+            lexical = load_lexical_index(self.index_dir, index_info)
+
+            self.index, self.metadata, self.lexical = index, metadata, lexical
+            self.index_info = index_info
+            self.fingerprint = fingerprint
+            self.shards = {}
+
+    def has_changed(self):
+        return index_fingerprint(self.index_dir) != self.fingerprint
+
+    def reload_if_changed(self):
+        if not self.has_changed():
+            return False
+        self.load()
+        return True
+
+    def shard_rows(self, query, metadata):
+        """Metadata rows of the insurer named in the query, or None for a global search."""
+        insurer = detect_insurer(query) if self.insurer_sharding else None
+        if insurer is None:
+            self.shard_stats["global"] += 1
+            return None
+
+        shards = self.shards
+        if insurer not in shards:
+            shards[insurer] = metadata.rows_for_sources(insurer_source_files(insurer))
+
+        rows = shards[insurer]
+        if len(rows) == 0:
+            self.shard_stats["no_shard"] += 1
+            return None
+
+        self.shard_stats["sharded"] += 1
+        self.shard_stats["searched_rows"] += len(rows)
+        return rows
+
+    def retrieve(self, query):
+        if self.scheduler is not None:
+            return self.scheduler.submit(query)
+
+        if self.auto_reload:
+            self.reload_if_changed()
+        index, metadata, lexical = self.index, self.metadata, self.lexical
+        rows = self.shard_rows(query, metadata)
+        return retrieve_clauses(query, index, metadata, self.backend, rows, lexical, self.retrieval_mode)
+
+    def retrieve_many(self, queries):
+        if self.auto_reload:
+            self.reload_if_changed()
+        index, metadata, lexical = self.index, self.metadata, self.lexical
+
+        # One bulk search per shard
+        groups = defaultdict(list)
+        for position, query in enumerate(queries):
+            rows = self.shard_rows(query, metadata)
+            groups[None if rows is None else id(rows)].append((position, rows))
+
+        results = [None] * len(queries)
+        for members in groups.values():
+            positions = [position for position, _ in members]
+            rows = members[0][1]
+            clauses = retrieve_clauses_bulk(
+                [queries[p] for p in positions], index, metadata, self.backend, rows, lexical, self.retrieval_mode
+            )
+            for position, retrieved in zip(positions, clauses):
+                results[position] = retrieved
+        return results
+
+    def complete(self, prompt, on_field=None):
+        streamed = []
+
+        def stream(client, **request):
+            streamed.append(True)
+            return stream_chat_completion(
+                client, on_field, LLM_STREAM_MAX_ATTEMPTS, self.stream_stats, **request
+            )
+
+        content = cached_chat_completion(
+            self.client,
+            self.response_cache,
+            bypass=LLM_CACHE_BYPASS,
+            call=stream if self.streaming else create_chat_completion,
+            model=LLM_MODEL,
+            messages=[{"role": "user", "content": prompt}],
+            temperature=0.2,
+            response_format={"type": "json_object"}
+        )
+
+        # Cache hits and non-streamed answers report their fields at the end
+        if on_field is not None and not streamed:
+            try:
+                IncrementalJSONParser(on_field).feed(content or "")
+            except OffSchemaOutput:
+                pass
+        return content
+
+    def reason_with_context(self, query, clauses=None, on_field=None):
+        if clauses is None:
+            clauses = self.retrieve(query)
+        context, stats = assemble_context(clauses, self.context_token_budget, get_model_encoding(LLM_MODEL))
+        self.context_stats.record(stats)
+        prompt = build_prompt(query, context)
+        return {
+            "raw_output": self.complete(prompt, on_field),
+            "retrieved_clauses": clauses,
+            "context_clauses": context,
+            "context_tokens": stats.tokens_assembled,
+            "context_tokens_saved": stats.tokens_saved
+        }
+
+    def reason(self, query, clauses=None, on_field=None):
+        return self.reason_with_context(query, clauses, on_field)["raw_output"]
+
+_default_reasoner = None
+_default_reasoner_lock = threading.Lock()
+_response_cache = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache():
+    """Process-wide LLM response cache, or None when LLM_CACHE_ENABLED is off."""
+    global _response_cache
+    if not LLM_CACHE_ENABLED:
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = ResponseCache(LLM_CACHE_PATH, LLM_CACHE_MAX_BYTES, LLM_CACHE_TTL_SECONDS)
+        return _response_cache
+
+
+def get_reasoner():
+    """Process-wide shared ClaimReasoner, created on first use."""
+    global _default_reasoner
+    with _default_reasoner_lock:
+        if _default_reasoner is None:
+            _default_reasoner = ClaimReasoner()
+        return _default_reasoner
+
+# -------------------------------------------------
+def run_reasoning(query, reasoner=None, clauses=None):
+    reasoner = reasoner or get_reasoner()
+    return reasoner.reason(query, clauses)
 
 # -------------------------------------------------
 if __name__ == "__main__":
@@ -1,7 +1,5 @@
 import os
 import sys
-import json
-import faiss
 import numpy as np
 import openai
 
@@ -11,38 +9,33 @@ import openai
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.append(PROJECT_ROOT)
 
+from src.retrieval.embedding_backends import get_backend
+from src.retrieval.vector_index import load_index_and_metadata as load_committed_index
+
 # -------------------------------------------------
 # Paths & config
 # -------------------------------------------------
 INDEX_DIR = "data/processed/vector_index"
 INDEX_FILE = "policy_faiss.index"
-META_FILE = "policy_metadata.json"
+META_FILE = "policy_metadata.bin"
 
-EMBEDDING_MODEL = "text-embedding-3-small"
 TOP_K = 5
 
 openai.api_key = os.getenv("OPENAI_API_KEY")
 
 # -------------------------------------------------
-def load_index_and_metadata():
-    index = faiss.read_index(os.path.join(INDEX_DIR, INDEX_FILE))
-
-    with open(os.path.join(INDEX_DIR, META_FILE), "r", encoding="utf-8") as f:
-        metadata = json.load(f)
-
-    return index, metadata
+def load_index_and_metadata(backend):
+    # Refuse to query with a different embedding backend than the index was built with
+    return load_committed_index(INDEX_DIR, INDEX_FILE, META_FILE, backend)
 
 # -------------------------------------------------
-def embed_query(query: str):
-    response = openai.embeddings.create(
-        model=EMBEDDING_MODEL,
-        input=query
-    )
-    return np.array(response.data[0].embedding).astype("float32")
+def embed_query(query: str, backend):
+    return backend.embed_query(query)
 
 # -------------------------------------------------
 def main():
-    index, metadata = load_index_and_metadata()
+    backend = get_backend()
+    index, metadata = load_index_and_metadata(backend)
 
     queries = [
         {
@@ -74,7 +67,7 @@ def main():
         print(query_item["text"].strip())
         print("=" * 100)
 
-        query_vector = embed_query(query_item["text"])
+        query_vector = embed_query(query_item["text"], backend)
         distances, indices = index.search(
             np.array([query_vector]), TOP_K
         )
@@ -82,12 +75,17 @@ def main():
         print("\nTop retrieved policy clauses:\n")
 
         for rank, idx in enumerate(indices[0], start=1):
+            if idx < 0:
+                continue
             chunk = metadata[idx]
             distance = distances[0][rank - 1]
 
             print(f"Result {rank}")
             print(f"Source file: {chunk['source_file']}")
-            print(f"L2 distance: {distance:.4f}")
+            if index.metric == "ip":
+                print(f"Cosine similarity: {distance:.4f}")
+            else:
+                print(f"L2 distance: {distance:.4f}")
             print("Text:")
             print(chunk["text"][:700])
             print("-" * 80)
@@ -0,0 +1,222 @@
+import os
+import sys
+import json
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+# -------------------------------------------------
+# Project setup
+# -------------------------------------------------
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from scripts.claim_reasoning import get_reasoner
+from src.reasoning.canonical_claims import parse_claim
+from src.reasoning.output_validation import classify_json_error, validate_schema
+from src.retrieval.citations import format_citation
+from src.serving.http_server import HTTPError, HTTPServer, json_response
+
+# -------------------------------------------------
+# Claims assessment service
+# -------------------------------------------------
+#   POST /assess    {"claim_text": "...", "claim_id": "..."} -> coverage decision
+#   POST /retrieve  {"query": "..."}                          -> top-k policy clauses
+#   GET  /health    index generation, load, p50/p99 latency of served requests
+#                   and 429 rejections per route
+#
+# The index, metadata and BM25 index are loaded once at startup (the
+# shared ClaimReasoner) and reloaded in place when a rebuild commits a
+# new generation. At most LLM_CONCURRENCY assessments run at once; up to
+# MAX_QUEUED_ASSESSMENTS more wait, and beyond that /assess answers 429
+# with Retry-After instead of queueing without bound. /retrieve is
+# bounded the same way by RETRIEVAL_WORKERS and MAX_QUEUED_RETRIEVALS.
+#
+# OPENAI_BASE_URL points the service at tests/ai_validation/stub_openai_server.py
+# for offline end-to-end runs.
+# -------------------------------------------------
+HOST = os.getenv("CLAIMS_API_HOST", "127.0.0.1")
+PORT = int(os.getenv("CLAIMS_API_PORT", "8080"))
+
+LLM_CONCURRENCY = 8
+MAX_QUEUED_ASSESSMENTS = 32
+RETRY_AFTER_SECONDS = 1
+
+# Threads for /retrieve; concurrent retrievals are coalesced by the
+# reasoner's micro-batching scheduler
+RETRIEVAL_WORKERS = 16
+MAX_QUEUED_RETRIEVALS = 256
+
+MAX_CLAIM_CHARS = 20000
+
+
+class ClaimsService:
+    def __init__(self, reasoner, llm_concurrency=LLM_CONCURRENCY, max_queued=MAX_QUEUED_ASSESSMENTS):
+        self.reasoner = reasoner
+        self.llm_concurrency = llm_concurrency
+        self.max_pending = llm_concurrency + max_queued
+        self.pending = 0
+        self.rejected = 0
+        self.max_pending_retrievals = RETRIEVAL_WORKERS + MAX_QUEUED_RETRIEVALS
+        self.pending_retrievals = 0
+        self.rejected_retrievals = 0
+
+        self.llm_executor = ThreadPoolExecutor(max_workers=llm_concurrency, thread_name_prefix="assess")
+        self.retrieval_executor = ThreadPoolExecutor(max_workers=RETRIEVAL_WORKERS, thread_name_prefix="retrieve")
+
+        self.server = HTTPServer({
+            ("POST", "/assess"): self.assess,
+            ("POST", "/retrieve"): self.retrieve,
+            ("GET", "/health"): self.health,
+        })
+
+    # -------------------------------------------------
+    @staticmethod
+    def _body(request):
+        body = request.json()
+        if not isinstance(body, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return body
+
+    @staticmethod
+    def _text_field(body, name):
+        value = body.get(name)
+        if not isinstance(value, str) or not value.strip():
+            raise HTTPError(400, f"'{name}' must be a non-empty string")
+        if len(value) > MAX_CLAIM_CHARS:
+            raise HTTPError(413, f"'{name}' is longer than {MAX_CLAIM_CHARS} characters")
+        return value
+
+    @staticmethod
+    def _clause_summary(clause):
+        return {
+            "citation": format_citation(clause),
+            "source_file": clause.get("source_file"),
+            "chunk_id": clause.get("chunk_id"),
+            "text": clause["text"]
+        }
+
+    def _assess(self, claim_text):
+        # Claim ID and formatting don't change the answer; the canonical
+        # text also makes repeated claims hit the LLM response cache
+        _, canonical_text = parse_claim(claim_text)
+        output = self.reasoner.reason_with_context(canonical_text)
+        raw_output = output["raw_output"]
+
+        result = {
+            "coverage_decision": None,
+            "conditions_or_exclusions": [],
+            "evidence_sources": [],
+            "confidence": None,
+            "error_type": None
+        }
+        if raw_output is None:
+            # No answer in the required schema (off-schema stream abandoned)
+            result["error_type"] = "ERR-SCHEMA-01"
+        else:
+            try:
+                parsed = json.loads(raw_output)
+                if validate_schema(parsed):
+                    result.update({k: parsed[k] for k in result if k in parsed})
+                else:
+                    result["error_type"] = "ERR-SCHEMA-01"
+            except json.JSONDecodeError:
+                result["error_type"] = classify_json_error(raw_output)
+
+        result["citations"] = [format_citation(c) for c in output["context_clauses"]]
+        result["context_tokens"] = output["context_tokens"]
+        return result
+
+    # -------------------------------------------------
+    async def assess(self, request):
+        body = self._body(request)
+        claim_text = self._text_field(body, "claim_text")
+
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPError(
+                429,
+                f"{self.pending} assessments in progress; retry later",
+                {"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
+
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            result = await loop.run_in_executor(self.llm_executor, self._assess, claim_text)
+        except Exception as e:
+            raise HTTPError(502, f"Assessment failed (ERR-RUNTIME-01): {e}")
+        finally:
+            self.pending -= 1
+
+        return json_response({"claim_id": body.get("claim_id"), **result})
+
+    async def retrieve(self, request):
+        query = self._text_field(self._body(request), "query")
+
+        if self.pending_retrievals >= self.max_pending_retrievals:
+            self.rejected_retrievals += 1
+            raise HTTPError(
+                429,
+                f"{self.pending_retrievals} retrievals in progress; retry later",
+                {"Retry-After": str(RETRY_AFTER_SECONDS)}
+            )
+
+        self.pending_retrievals += 1
+        try:
+            loop = asyncio.get_running_loop()
+            clauses = await loop.run_in_executor(self.retrieval_executor, self.reasoner.retrieve, query)
+        finally:
+            self.pending_retrievals -= 1
+        return json_response({"clauses": [self._clause_summary(c) for c in clauses]})
+
+    async def health(self, request):
+        info = self.reasoner.index_info or {}
+        payload = {
+            "status": "ok",
+            "index": {
+                "generation": info.get("generation"),
+                "type": info.get("index", {}).get("type", "flat"),
+                "vectors": info.get("ntotal"),
+                "embedding": info.get("embedding")
+            },
+            "assessments": {
+                "in_progress": min(self.pending, self.llm_concurrency),
+                "queued": max(self.pending - self.llm_concurrency, 0),
+                "rejected": self.rejected
+            },
+            "retrievals": {
+                "pending": self.pending_retrievals,
+                "rejected": self.rejected_retrievals
+            },
+            "latency": self.server.latency.summary()
+        }
+        if self.reasoner.response_cache is not None:
+            # SQLite query; keep it off the event loop like the other blocking calls
+            loop = asyncio.get_running_loop()
+            payload["llm_cache"] = await loop.run_in_executor(
+                self.retrieval_executor, self.reasoner.response_cache.stats
+            )
+        return json_response(payload)
+
+    # -------------------------------------------------
+    async def serve(self, host=HOST, port=PORT):
+        await self.server.start(host, port)
+        print(f"Claims API listening on http://{host}:{self.server.port}")
+        try:
+            await self.server.serve_forever()
+        finally:
+            self.llm_executor.shutdown(wait=False, cancel_futures=True)
+            self.retrieval_executor.shutdown(wait=False, cancel_futures=True)
+
+
+def main():
+    print("Loading index and metadata...")
+    service = ClaimsService(get_reasoner())
+    try:
+        asyncio.run(service.serve())
+    except KeyboardInterrupt:
+        print("\nShutting down.")
+
+
+if __name__ == "__main__":
+    main()
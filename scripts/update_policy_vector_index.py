@@ -0,0 +1,146 @@
+import os
+import sys
+import time
+import faiss
+import numpy as np
+
+# Add project root
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(PROJECT_ROOT)
+
+from src.retrieval.batching import iter_record_batches
+from src.retrieval.embedding_cache import EmbeddingCache
+from src.retrieval.embedding_backends import get_backend
+from src.retrieval.metadata_store import MetadataStore, MetadataStoreWriter
+from src.retrieval.bm25 import BM25IndexWriter
+from src.retrieval.vector_index import (
+    read_index_info,
+    check_embedding_backend,
+    committed_files,
+    normalize_vectors,
+    next_generation,
+    commit_generation
+)
+from scripts.build_policy_vector_index import (
+    INDEX_DIR,
+    INDEX_FILE,
+    META_FILE,
+    LEXICAL_FILE,
+    EMBED_BATCH_MAX_TOKENS,
+    EMBED_BATCH_MAX_ITEMS,
+    EMBED_CONCURRENCY,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_CACHE_MAX_BYTES,
+    iter_index_chunks,
+    create_embedder,
+    embed_texts
+)
+
+# -------------------------------------------------
+# Brings an existing index in line with policy_chunks.jsonl (as rewritten
+# by build_policy_chunks.py) without re-embedding unchanged chunks:
+#   - chunks whose chunk_uid is not in the index are embedded and added
+#   - vectors whose chunk_uid is no longer produced are removed
+#     (a changed chunk gets a new chunk_uid, so it is both)
+# The metadata store and BM25 index are rewritten alongside, and all three
+# are published as one generation by committing index_info.json, so
+# readers never see an index and metadata that disagree.
+#
+# Cost: only embedding and the FAISS add/remove scale with the changed
+# chunks. Near-duplicate detection (MinHash over every chunk), the
+# metadata store and the BM25 index are still O(corpus) on every update:
+# dedup picks the earliest match in corpus order, and both stores are
+# immutable per-generation files (BM25 IDF depends on every document),
+# so they are recomputed and rewritten in full. This is CPU and disk
+# work only, no API calls.
+#
+# HNSW graphs can't remove vectors; rebuild those with
+# build_policy_vector_index.py.
+# -------------------------------------------------
+
+
+def main():
+    info = read_index_info(INDEX_DIR)
+    index_settings = info.get("index", {})
+    if not index_settings.get("id_map"):
+        raise SystemExit("Index has no chunk_uid mapping; run scripts/build_policy_vector_index.py once first.")
+    if index_settings.get("type") == "hnsw":
+        raise SystemExit("HNSW indexes don't support removal; run scripts/build_policy_vector_index.py instead.")
+
+    backend = get_backend()
+    check_embedding_backend(info, backend)
+
+    index_file, meta_file = committed_files(info, INDEX_FILE, META_FILE)
+    index = faiss.read_index(os.path.join(INDEX_DIR, index_file))
+    metadata = MetadataStore(os.path.join(INDEX_DIR, meta_file))
+    indexed_uids = set(metadata.chunk_uids().tolist())
+    metadata.close()
+
+    generation, files = next_generation(INDEX_DIR, {
+        "index": INDEX_FILE,
+        "metadata": META_FILE,
+        "lexical": LEXICAL_FILE
+    })
+    start = time.perf_counter()
+
+    # One pass over the whole corpus (O(corpus), see the header): the new
+    # metadata and BM25 index are written in full, and only chunks missing
+    # from the index are kept for embedding
+    chunks, _ = iter_index_chunks()
+    current_uids = set()
+    added = []
+    with MetadataStoreWriter(os.path.join(INDEX_DIR, files["metadata"])) as metadata_writer, \
+            BM25IndexWriter(os.path.join(INDEX_DIR, files["lexical"])) as lexical_writer:
+        for chunk in chunks:
+            metadata_writer.write(chunk)
+            lexical_writer.add(chunk["text"])
+            current_uids.add(chunk["chunk_uid"])
+            if chunk["chunk_uid"] not in indexed_uids:
+                added.append(chunk)
+
+    removed = indexed_uids - current_uids
+    if removed:
+        index.remove_ids(np.array(sorted(removed), dtype="int64"))
+
+    if added:
+        cache = EmbeddingCache(EMBEDDING_CACHE_PATH, EMBEDDING_CACHE_MAX_BYTES)
+        embedder = create_embedder(backend, cache)
+
+        window_tokens = EMBED_BATCH_MAX_TOKENS * EMBED_CONCURRENCY
+        window_items = EMBED_BATCH_MAX_ITEMS * EMBED_CONCURRENCY
+        for batch in iter_record_batches(added, window_tokens, window_items):
+            token_counts = [c.get("token_count") for c in batch]
+            embeddings = embed_texts(
+                [c["text"] for c in batch],
+                backend,
+                cache=cache,
+                embedder=embedder,
+                token_counts=token_counts if None not in token_counts else None
+            )
+
+            vectors = np.array(embeddings).astype("float32")
+            if index_settings.get("params", {}).get("metric") == "ip":
+                vectors = normalize_vectors(vectors)
+            index.add_with_ids(vectors, np.array([c["chunk_uid"] for c in batch], dtype="int64"))
+
+        if backend.is_remote:
+            print(f"Embedding client: {embedder.stats.summary()}")
+        cache.close()
+
+    faiss.write_index(index, os.path.join(INDEX_DIR, files["index"]))
+    commit_generation(INDEX_DIR, {
+        **info,
+        "ntotal": index.ntotal,
+        "generation": generation,
+        "files": files
+    })
+
+    print(
+        f"Updated index to generation {generation} in {time.perf_counter() - start:.1f}s: "
+        f"{len(added)} added, {len(removed)} removed, "
+        f"{len(current_uids) - len(added)} unchanged, {index.ntotal} vectors total"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,166 @@
-def chunk_text(
+import re
+
+from src.utils.tokens import get_encoding, count_tokens
+
+# Sentence ends and (weaker) clause ends, followed by whitespace
+SENTENCE_BOUNDARY = re.compile(r"[.!?;:](?=\s)")
+CLAUSE_BOUNDARY = re.compile(r"[,)\]](?=\s)")
+
+
+def chunk_spans(
     text: str,
     chunk_size: int = 800,
     overlap: int = 150
 ) -> list:
-    chunks = []
+    spans = []
     start = 0
     text_length = len(text)
 
     while start < text_length:
         end = start + chunk_size
-        chunk = text[start:end]
-        chunks.append(chunk)
+        spans.append((start, min(end, text_length)))
         start = end - overlap
 
-    return chunks
+    return spans
+
+
+def chunk_text(
+    text: str,
+    chunk_size: int = 800,
+    overlap: int = 150
+) -> list:
+    return [text[start:end] for start, end in chunk_spans(text, chunk_size, overlap)]
+
+
+# -------------------------------------------------
+# Token-budgeted chunking
+# -------------------------------------------------
+def _boundary_marks(text: str) -> bytearray:
+    """
+    Per-character marks: 2 where a sentence may start, 1 where a clause
+    may start, 0 otherwise. Both the position right after the punctuation
+    and the one after the following space are marked, because tokens
+    usually carry their leading space.
+    """
+    marks = bytearray(len(text) + 1)
+    for pattern, strength in ((CLAUSE_BOUNDARY, 1), (SENTENCE_BOUNDARY, 2)):
+        for match in pattern.finditer(text):
+            for pos in (match.end(), match.end() + 1):
+                if pos <= len(text) and marks[pos] < strength:
+                    marks[pos] = strength
+    return marks
+
+
+def token_chunk_spans(
+    text: str,
+    max_tokens: int = 200,
+    overlap_tokens: int = 40,
+    min_tokens: int = 100,
+    encoding=None
+) -> list:
+    """
+    Splits text into windows of at most max_tokens tokens and returns
+    (start_char, end_char, token_count) per window.
+
+    A window ends at the last sentence boundary that leaves it at least
+    min_tokens long. If there is none, it ends at the last clause
+    boundary, and failing that it is cut at max_tokens. The next window
+    starts overlap_tokens back from there, moved forward to a sentence
+    start when one falls in the overlap.
+
+    Encoding, boundary detection and the "last/next boundary" lookups
+    are each one linear pass, so the whole split is O(len(text)).
+    """
+    encoding = encoding or get_encoding()
+    tokens = encoding.encode_ordinary(text)
+    if not tokens:
+        return []
+
+    _, offsets = encoding.decode_with_offsets(tokens)
+    n = len(tokens)
+    offsets = list(offsets) + [len(text)]
+
+    marks = _boundary_marks(text)
+    strength = [marks[offsets[i]] for i in range(n + 1)]
+    strength[n] = 2  # end of text is always a clean cut
+
+    # last_sentence[i] / last_clause[i]: greatest j <= i with that boundary (or -1)
+    last_sentence = [-1] * (n + 1)
+    last_clause = [-1] * (n + 1)
+    for i in range(n + 1):
+        prev_s = last_sentence[i - 1] if i else -1
+        prev_c = last_clause[i - 1] if i else -1
+        last_sentence[i] = i if strength[i] == 2 else prev_s
+        last_clause[i] = i if strength[i] >= 1 else prev_c
+
+    # next_sentence[i]: smallest j >= i with a sentence boundary
+    next_sentence = [n] * (n + 2)
+    for i in range(n, -1, -1):
+        next_sentence[i] = i if strength[i] == 2 else next_sentence[i + 1]
+
+    spans = []
+    start = 0
+
+    while start < n:
+        hard_end = min(start + max_tokens, n)
+        floor = start + min(min_tokens, max_tokens)
+
+        if hard_end == n:
+            end = n
+        elif last_sentence[hard_end] >= floor:
+            end = last_sentence[hard_end]
+        elif last_clause[hard_end] >= floor:
+            end = last_clause[hard_end]
+        else:
+            end = hard_end
+
+        spans.append((offsets[start], offsets[end], end - start))
+
+        if end == n:
+            break
+
+        next_start = max(end - overlap_tokens, start + 1)
+        if next_sentence[next_start] < end:
+            next_start = next_sentence[next_start]
+        start = next_start
+
+    return spans
+
+
+# -------------------------------------------------
+# Chunk records
+# -------------------------------------------------
+def document_chunk_spans(text: str, mode: str = "characters", **settings) -> list:
+    """
+    (start, end, token_count) per chunk of text.
+
+    mode "characters" uses the fixed chunk_size / overlap windows.
+    mode "tokens" uses token_chunk_spans with max_tokens / overlap_tokens
+    / min_tokens.
+    """
+    if mode == "characters":
+        return [
+            (start, end, count_tokens(text[start:end]))
+            for start, end in chunk_spans(text, **settings)
+        ]
+
+    if mode == "tokens":
+        return token_chunk_spans(text, **settings)
+
+    raise ValueError(f"Unknown chunking mode: {mode!r}")
+
+
+def chunk_document(text: str, mode: str = "characters", **settings) -> list:
+    """
+    Chunks text and returns dicts with text, start / end character
+    offsets into `text` and token_count.
+    """
+    return [
+        {
+            "text": text[start:end],
+            "start": start,
+            "end": end,
+            "token_count": token_count
+        }
+        for start, end, token_count in document_chunk_spans(text, mode, **settings)
+    ]
@@ -0,0 +1,148 @@
+import re
+import zlib
+
+import numpy as np
+
+WORD_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Amounts, percentages and periods ("Rs 40,000", "10%", "24 months"):
+# two chunks that differ in any of these are never the same clause
+FIGURE_PATTERN = re.compile(
+    r"(?:(rs\.?|inr|₹)\s*)?(\d[\d,]*(?:\.\d+)?)"
+    r"(?:\s*(%|percent|lakhs?|lacs?|crores?|days?|months?|years?)(?![a-z]))?"
+)
+
+# Mersenne prime for the universal hash family (a * x + b) mod p
+_PRIME = (1 << 31) - 1
+
+
+def figures(text: str) -> tuple:
+    """Number and amount tokens of a chunk, in order of appearance."""
+    return tuple(
+        (
+            "rs" if currency else "",
+            number.replace(",", ""),
+            "%" if unit == "percent" else unit.rstrip("s") if unit else ""
+        )
+        for currency, number, unit in FIGURE_PATTERN.findall(text.lower())
+    )
+
+
+def shingles(text: str, size: int = 5) -> set:
+    """Hashed word n-gram shingles of lowercased alphanumeric text."""
+    words = WORD_PATTERN.findall(text.lower())
+    if len(words) < size:
+        return {zlib.crc32(" ".join(words).encode("utf-8"))} if words else set()
+    return {
+        zlib.crc32(" ".join(words[i:i + size]).encode("utf-8"))
+        for i in range(len(words) - size + 1)
+    }
+
+
+class NearDuplicateIndex:
+    """
+    MinHash + LSH banding over chunk shingles.
+
+    add(key, text) returns the key of an earlier chunk whose estimated
+    Jaccard similarity is at least `threshold` and whose figures() are
+    identical, or None if the chunk is new (it then becomes a canonical
+    chunk). Clauses that only differ in a sub-limit or waiting period
+    stay separate, so every insurer keeps its own figures. Only
+    canonical signatures are kept, so memory scales with the number of
+    unique chunks.
+    """
+
+    def __init__(self, threshold: float = 0.8, num_perm: int = 128, bands: int = 16,
+                 shingle_size: int = 5, seed: int = 7):
+        if num_perm % bands:
+            raise ValueError("num_perm must be divisible by bands")
+
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.shingle_size = shingle_size
+
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, _PRIME, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, _PRIME, size=num_perm, dtype=np.uint64)
+
+        self._buckets = [{} for _ in range(bands)]
+        self._signatures = {}
+        self._figures = {}
+
+    def signature(self, text: str) -> np.ndarray:
+        hashed = np.fromiter(shingles(text, self.shingle_size), dtype=np.uint64)
+        if hashed.size == 0:
+            return np.full(self.num_perm, _PRIME, dtype=np.uint64)
+        hashed %= _PRIME
+        # (num_perm, n_shingles) -> min over shingles
+        values = (self._a[:, None] * hashed[None, :] + self._b[:, None]) % _PRIME
+        return values.min(axis=1)
+
+    def add(self, key, text: str):
+        signature = self.signature(text)
+        chunk_figures = figures(text)
+        band_keys = [
+            signature[b * self.rows:(b + 1) * self.rows].tobytes()
+            for b in range(self.bands)
+        ]
+
+        seen = set()
+        for band, band_key in enumerate(band_keys):
+            for candidate in self._buckets[band].get(band_key, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if self._figures[candidate] != chunk_figures:
+                    continue
+                similarity = float(np.mean(self._signatures[candidate] == signature))
+                if similarity >= self.threshold:
+                    return candidate
+
+        self._signatures[key] = signature
+        self._figures[key] = chunk_figures
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band].setdefault(band_key, []).append(key)
+        return None
+
+
+def find_near_duplicates(chunks, threshold: float = 0.8) -> tuple:
+    """
+    One pass over an iterable of chunk records.
+
+    Returns (canonical_of, source_files) where canonical_of maps the
+    position of every duplicate chunk to the position of its canonical
+    chunk, and source_files maps every canonical position to the ordered,
+    unique list of files whose chunks collapsed into it.
+    """
+    index = NearDuplicateIndex(threshold=threshold)
+    canonical_of = {}
+    source_files = {}
+
+    for position, chunk in enumerate(chunks):
+        canonical = index.add(position, chunk["text"])
+        if canonical is None:
+            source_files[position] = [chunk["source_file"]]
+            continue
+
+        canonical_of[position] = canonical
+        if chunk["source_file"] not in source_files[canonical]:
+            source_files[canonical].append(chunk["source_file"])
+
+    return canonical_of, source_files
+
+
+def iter_canonical_chunks(chunks, canonical_of: dict, source_files: dict, stats: dict = None):
+    """
+    Second pass: yields only canonical chunks, each carrying the
+    source_files of every chunk that collapsed into it. If given, `stats`
+    accumulates the skipped chunks' token_count under "skipped_tokens".
+    """
+    for position, chunk in enumerate(chunks):
+        if position in canonical_of:
+            if stats is not None:
+                stats["skipped_tokens"] = stats.get("skipped_tokens", 0) + (chunk.get("token_count") or 0)
+            continue
+        chunk["source_files"] = source_files[position]
+        yield chunk
@@ -0,0 +1,90 @@
+from bisect import bisect_right
+
+from src.utils.text_cleaning import clean_text
+
+
+class DocumentText:
+    """
+    Cleaned text of one policy document as a single buffer, plus the
+    character offset where each page starts. Chunks refer to this buffer
+    by offsets, not by holding copies of the text.
+    """
+
+    __slots__ = ("doc_id", "text", "page_starts", "page_numbers")
+
+    def __init__(self, doc_id: str, text: str, page_starts: list, page_numbers: list):
+        self.doc_id = doc_id
+        self.text = text
+        self.page_starts = page_starts
+        self.page_numbers = page_numbers
+
+    @classmethod
+    def from_pages(cls, doc_id: str, pages: list) -> "DocumentText":
+        """
+        Cleans each page and joins the non-empty ones with a single space.
+        This is the same text as clean_text() of the whole document, but
+        it keeps where each page (1-based) starts.
+        """
+        parts = []
+        page_starts = []
+        page_numbers = []
+        offset = 0
+
+        for page_number, page_text in enumerate(pages, start=1):
+            cleaned = clean_text(page_text) if page_text else ""
+            if not cleaned:
+                continue
+            if parts:
+                offset += 1  # joining space
+            page_starts.append(offset)
+            page_numbers.append(page_number)
+            parts.append(cleaned)
+            offset += len(cleaned)
+
+        return cls(doc_id, " ".join(parts), page_starts, page_numbers)
+
+    def page_at(self, offset: int) -> int:
+        if not self.page_numbers:
+            return None
+        position = max(bisect_right(self.page_starts, offset) - 1, 0)
+        return self.page_numbers[position]
+
+    def view(self, start: int, end: int, token_count: int = None) -> "ChunkView":
+        return ChunkView(self, start, end, token_count)
+
+    def __len__(self):
+        return len(self.text)
+
+
+class ChunkView:
+    """
+    A chunk as (document, start, end) offsets into a DocumentText.
+    The text is only sliced out when .text is read.
+    """
+
+    __slots__ = ("document", "start", "end", "token_count")
+
+    def __init__(self, document: DocumentText, start: int, end: int, token_count: int = None):
+        self.document = document
+        self.start = start
+        self.end = end
+        self.token_count = token_count
+
+    @property
+    def doc_id(self) -> str:
+        return self.document.doc_id
+
+    @property
+    def text(self) -> str:
+        return self.document.text[self.start:self.end]
+
+    @property
+    def page_start(self) -> int:
+        return self.document.page_at(self.start)
+
+    @property
+    def page_end(self) -> int:
+        return self.document.page_at(max(self.end - 1, self.start))
+
+    def __len__(self):
+        return self.end - self.start
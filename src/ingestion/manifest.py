@@ -0,0 +1,103 @@
+import hashlib
+import json
+import os
+
+MANIFEST_VERSION = 3
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def stable_chunk_uid(source_file: str, chunk_index: int, text: str) -> int:
+    """
+    63-bit chunk id derived from the source file, position and text.
+    The same chunk always gets the same id across runs, and it fits a
+    signed int64 so it can be used directly as a FAISS vector id.
+    """
+    digest = hashlib.blake2b(
+        f"{source_file}\x00{chunk_index}\x00{text}".encode("utf-8"),
+        digest_size=8
+    ).digest()
+    return int.from_bytes(digest, "big") >> 1
+
+
+def empty_manifest(chunker_settings: dict) -> dict:
+    return {
+        "version": MANIFEST_VERSION,
+        "chunker": chunker_settings,
+        "documents": {}
+    }
+
+
+def load_manifest(path: str, chunker_settings: dict) -> dict:
+    """
+    Loads the ingestion manifest. A missing file, an older format or
+    different chunker settings all return an empty manifest, which makes
+    the next run reprocess every document.
+    """
+    if not os.path.exists(path):
+        return empty_manifest(chunker_settings)
+
+    with open(path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("chunker") != chunker_settings:
+        return empty_manifest(chunker_settings)
+
+    return manifest
+
+
+def save_manifest(manifest: dict, path: str):
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def describe_file(path: str) -> dict:
+    stat = os.stat(path)
+    return {
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": file_sha256(path)
+    }
+
+
+def diff_documents(pdf_dir: str, manifest: dict) -> dict:
+    """
+    Compares the PDFs on disk against the manifest.
+
+    Size and mtime are checked first. The content hash is only computed
+    when one of them changed, so a touched but identical file counts as
+    unchanged. Returns sorted filename lists under added / modified /
+    unchanged / removed.
+    """
+    known = manifest["documents"]
+    on_disk = sorted(f for f in os.listdir(pdf_dir) if f.endswith(".pdf"))
+
+    changes = {"added": [], "modified": [], "unchanged": [], "removed": []}
+
+    for filename in on_disk:
+        path = os.path.join(pdf_dir, filename)
+        entry = known.get(filename)
+
+        if entry is None:
+            changes["added"].append(filename)
+            continue
+
+        stat = os.stat(path)
+        if stat.st_size == entry["size"] and stat.st_mtime_ns == entry["mtime_ns"]:
+            changes["unchanged"].append(filename)
+        elif file_sha256(path) == entry["sha256"]:
+            entry["mtime_ns"] = stat.st_mtime_ns
+            changes["unchanged"].append(filename)
+        else:
+            changes["modified"].append(filename)
+
+    changes["removed"] = sorted(set(known) - set(on_disk))
+    return changes
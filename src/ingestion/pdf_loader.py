@@ -1,20 +1,121 @@
 import os
+from concurrent.futures import ProcessPoolExecutor
 from PyPDF2 import PdfReader
 
-def load_pdf_text(pdf_path: str) -> str:
+# Large PDFs are split into page ranges of this size for the process pool
+PAGES_PER_TASK = 20
+
+
+def load_pdf_pages(pdf_path: str, start: int = 0, end: int = None) -> list:
+    """Extracted text of pages [start, end), one string per page."""
     reader = PdfReader(pdf_path)
-    text = []
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            text.append(page_text)
-    return "\n".join(text)
+    pages = reader.pages[start:end]
+    return [page.extract_text() or "" for page in pages]
+
+
+def join_pages(pages: list) -> str:
+    return "\n".join(page_text for page_text in pages if page_text)
+
+
+def load_pdf_text(pdf_path: str) -> str:
+    return join_pages(load_pdf_pages(pdf_path))
+
+
+def count_pdf_pages(pdf_path: str) -> int:
+    return len(PdfReader(pdf_path).pages)
+
+
+def _document_ranges(pdf_path: str, pages_per_task: int) -> list:
+    num_pages = count_pdf_pages(pdf_path)
+    return [
+        (start, min(start + pages_per_task, num_pages))
+        for start in range(0, num_pages, pages_per_task)
+    ]
+
+
+def iter_extracted_pdfs(paths: list, workers: int = 1, pages_per_task: int = PAGES_PER_TASK):
+    """
+    Yields (path, pages, error) for every PDF in `paths`, in input order.
+    pages is the per-page text list, or None if extraction failed (error
+    then holds the message).
+
+    With workers > 1 the work runs in a process pool, one task per
+    `pages_per_task` page range, so a single large PDF is spread across
+    cores as well. Only a window of 2 * workers documents is in flight at
+    a time, so memory stays bounded however many PDFs there are. Output
+    does not depend on worker count, and failures are isolated per
+    document.
+    """
+    if workers <= 1:
+        for path in paths:
+            try:
+                yield path, load_pdf_pages(path), None
+            except Exception as e:
+                yield path, None, f"{type(e).__name__}: {e}"
+        return
+
+    window = 2 * workers
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        in_flight = []
+
+        def submit(path):
+            try:
+                ranges = _document_ranges(path, pages_per_task)
+            except Exception as e:
+                return path, None, f"{type(e).__name__}: {e}"
+            return path, [executor.submit(load_pdf_pages, path, s, e) for s, e in ranges], None
+
+        def collect(entry):
+            path, futures, error = entry
+            if error is not None:
+                return path, None, error
+            try:
+                pages = []
+                for future in futures:
+                    pages.extend(future.result())
+                return path, pages, None
+            except Exception as e:
+                return path, None, f"{type(e).__name__}: {e}"
+
+        for path in paths:
+            in_flight.append(submit(path))
+            if len(in_flight) >= window:
+                yield collect(in_flight.pop(0))
+
+        while in_flight:
+            yield collect(in_flight.pop(0))
+
+
+def extract_pdfs(paths: list, workers: int = 1, pages_per_task: int = PAGES_PER_TASK):
+    """
+    Eager form of iter_extracted_pdfs.
+    Returns (pages_by_path, failures), where failures maps a path to its
+    error message.
+    """
+    pages_by_path = {}
+    failures = {}
+
+    for path, pages, error in iter_extracted_pdfs(paths, workers, pages_per_task):
+        if error is not None:
+            failures[path] = error
+        else:
+            pages_by_path[path] = pages
+
+    return pages_by_path, failures
+
+
+def load_all_policies(pdf_dir: str, workers: int = 1, pages_per_task: int = PAGES_PER_TASK) -> dict:
+    files = sorted(f for f in os.listdir(pdf_dir) if f.endswith(".pdf"))
+    paths = [os.path.join(pdf_dir, f) for f in files]
+
+    pages_by_path, failures = extract_pdfs(paths, workers, pages_per_task)
 
+    for path, error in failures.items():
+        print(f"Skipping {os.path.basename(path)}: {error}")
 
-def load_all_policies(pdf_dir: str) -> dict:
     documents = {}
-    for file in os.listdir(pdf_dir):
-        if file.endswith(".pdf"):
-            path = os.path.join(pdf_dir, file)
-            documents[file] = load_pdf_text(path)
+    for file, path in zip(files, paths):
+        if path in pages_by_path:
+            documents[file] = join_pages(pages_by_path[path])
     return documents
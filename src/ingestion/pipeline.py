@@ -0,0 +1,62 @@
+import os
+
+from src.ingestion.pdf_loader import iter_extracted_pdfs
+from src.ingestion.chunker import document_chunk_spans
+from src.ingestion.document import DocumentText
+from src.ingestion.manifest import stable_chunk_uid
+
+
+# -------------------------------------------------
+# Streaming ingestion: pages -> cleaned text -> chunks -> writer
+# -------------------------------------------------
+# Each stage is a generator over one document at a time, so peak memory
+# is set by the largest single document, not by the size of the corpus.
+# Chunks are ChunkViews (offsets into the document buffer); text is only
+# materialized when a record is written.
+
+
+def iter_document_pages(paths: list, workers: int = 1, failures: dict = None):
+    """
+    Yields (filename, pages) per readable PDF. Unreadable PDFs are
+    recorded in `failures` (filename -> error) and skipped.
+    """
+    for path, pages, error in iter_extracted_pdfs(paths, workers):
+        filename = os.path.basename(path)
+        if error is not None:
+            if failures is not None:
+                failures[filename] = error
+            continue
+        yield filename, pages
+
+
+def iter_cleaned_documents(documents):
+    for filename, pages in documents:
+        yield DocumentText.from_pages(filename, pages)
+
+
+def iter_chunk_views(document: DocumentText, chunker_settings: dict):
+    if not document.text:
+        return
+
+    for start, end, token_count in document_chunk_spans(document.text, **chunker_settings):
+        yield document.view(start, end, token_count)
+
+
+def chunk_record(chunk_id: int, chunk) -> dict:
+    text = chunk.text
+    return {
+        "source_file": chunk.doc_id,
+        "chunk_id": chunk_id,
+        "chunk_uid": stable_chunk_uid(chunk.doc_id, chunk_id, text),
+        "text": text,
+        "start": chunk.start,
+        "end": chunk.end,
+        "page_start": chunk.page_start,
+        "page_end": chunk.page_end,
+        "token_count": chunk.token_count
+    }
+
+
+def iter_document_chunks(document: DocumentText, chunker_settings: dict):
+    for idx, chunk in enumerate(iter_chunk_views(document, chunker_settings)):
+        yield chunk_record(idx, chunk)
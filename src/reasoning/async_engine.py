@@ -0,0 +1,66 @@
+import asyncio
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+from src.reasoning.output_validation import evaluate_claim
+
+DEFAULT_CONCURRENCY = 8
+
+
+@dataclass
+class ThroughputReport:
+    claims: int
+    elapsed_seconds: float
+    concurrency: int
+    error_counts: Counter = field(default_factory=Counter)
+
+    @property
+    def claims_per_sec(self) -> float:
+        if self.elapsed_seconds <= 0:
+            return 0.0
+        return self.claims / self.elapsed_seconds
+
+    def summary(self) -> str:
+        errors = ", ".join(f"{k}={v}" for k, v in sorted(self.error_counts.items())) or "none"
+        return (
+            f"{self.claims} claims in {self.elapsed_seconds:.2f}s "
+            f"({self.claims_per_sec:.2f} claims/sec, concurrency={self.concurrency}) | "
+            f"errors: {errors}"
+        )
+
+
+# -------------------------------------------------
+async def run_claims_async(claims: list, reason_fn, concurrency: int = DEFAULT_CONCURRENCY) -> list:
+    """
+    Evaluates claims with up to `concurrency` reason_fn calls in flight.
+    reason_fn is the blocking (claim_text, clauses) -> raw output call,
+    run on a bounded thread pool. Results come back in input order.
+    """
+    loop = asyncio.get_running_loop()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        tasks = [
+            loop.run_in_executor(executor, evaluate_claim, claim, reason_fn)
+            for claim in claims
+        ]
+        return await asyncio.gather(*tasks)
+
+
+def process_claims(claims: list, reason_fn, concurrency: int = DEFAULT_CONCURRENCY):
+    """
+    Synchronous entry point for the batch runner.
+    Returns (results, ThroughputReport).
+    """
+    start = time.perf_counter()
+    results = asyncio.run(run_claims_async(claims, reason_fn, concurrency))
+    elapsed = time.perf_counter() - start
+
+    report = ThroughputReport(
+        claims=len(results),
+        elapsed_seconds=elapsed,
+        concurrency=concurrency,
+        error_counts=Counter(r["error_type"] for r in results if r["error_type"])
+    )
+    return results, report
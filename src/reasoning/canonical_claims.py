@@ -0,0 +1,125 @@
+import json
+import re
+from dataclasses import dataclass, field
+
+# "Label: value" or "Label:" followed by the value on the next line(s)
+FIELD_LINE = re.compile(r"^\s*([A-Za-z][A-Za-z /()&-]*?)\s*:\s*(.*)$")
+
+# Fields that differ between otherwise identical claims and never
+# influence the coverage decision
+IGNORED_FIELDS = {"claim id"}
+
+_DASHES = re.compile(r"[‐-―−-]")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_value(value: str) -> str:
+    value = _DASHES.sub("-", value.lower())
+    value = re.sub(r"\s*-\s*", " - ", value)
+    return _WHITESPACE.sub(" ", value).strip()
+
+
+def parse_claim(text: str):
+    """
+    Splits a claim into its labelled fields. Returns (fields, canonical_text):
+    fields maps lowercased labels to values (unlabelled lines go under "");
+    canonical_text is the claim without the IGNORED_FIELDS lines.
+
+    Only a bare "Label:" takes the lines after it as its value (up to the
+    next blank line; a single line for IGNORED_FIELDS), so free text after
+    "Claim ID: 1234" is never mistaken for part of the ignored field.
+    """
+    fields = {}
+    kept = []
+    label = None  # bare label still collecting value lines
+
+    for line in text.splitlines():
+        stripped = line.strip()
+        if not stripped:
+            label = None
+            if kept and kept[-1]:
+                kept.append("")
+            continue
+
+        match = FIELD_LINE.match(line)
+        if match:
+            key = match.group(1).lower()
+            value = match.group(2).strip()
+            fields[key] = value
+            label = None if value else key
+        elif label is not None:
+            key = label
+            fields[key] = f"{fields[key]} {stripped}".strip()
+            if key in IGNORED_FIELDS:
+                label = None
+        else:
+            key = ""
+            fields[key] = f"{fields.get(key, '')} {stripped}".strip()
+
+        if key not in IGNORED_FIELDS:
+            kept.append(stripped)
+
+    return fields, "\n".join(kept).strip()
+
+
+def canonical_key(fields: dict) -> str:
+    """Order- and formatting-insensitive key over the decision-relevant fields."""
+    return json.dumps(
+        sorted(
+            (label, normalize_value(value))
+            for label, value in fields.items()
+            if label not in IGNORED_FIELDS
+        ),
+        ensure_ascii=False
+    )
+
+
+# -------------------------------------------------
+# Grouping
+# -------------------------------------------------
+@dataclass
+class ClaimGroup:
+    key: str
+    text: str  # canonical text of the first member, what gets reasoned over
+    members: list = field(default_factory=list)
+
+
+@dataclass
+class ClaimGrouping:
+    claims: int
+    groups: list
+
+    @property
+    def dedup_ratio(self) -> float:
+        return self.claims / len(self.groups) if self.groups else 0.0
+
+    @property
+    def calls_saved(self) -> int:
+        return self.claims - len(self.groups)
+
+    def fan_out(self, group_results: list) -> list:
+        """One result per group (same order as groups) -> one per claim, in input order."""
+        results = [None] * self.claims
+        for group, result in zip(self.groups, group_results):
+            for i in group.members:
+                results[i] = result
+        return results
+
+    def summary(self) -> str:
+        return (
+            f"{self.claims} claims -> {len(self.groups)} unique "
+            f"(dedup ratio {self.dedup_ratio:.2f}x, {self.calls_saved} retrieval/LLM calls saved)"
+        )
+
+
+def group_claims(claim_texts: list) -> ClaimGrouping:
+    """Groups claims by canonical_key(), in order of first appearance."""
+    groups = {}
+    for i, text in enumerate(claim_texts):
+        fields, canonical_text = parse_claim(text)
+        key = canonical_key(fields)
+        if key not in groups:
+            groups[key] = ClaimGroup(key, canonical_text)
+        groups[key].members.append(i)
+
+    return ClaimGrouping(len(claim_texts), list(groups.values()))
@@ -0,0 +1,173 @@
+import threading
+from dataclasses import dataclass, field
+
+from src.retrieval.citations import chunk_sources, format_citation
+from src.utils.tokens import get_encoding, count_tokens
+
+# A clause cut to fewer tokens than this is dropped instead
+MIN_CLAUSE_TOKENS = 40
+
+
+def format_clause(number: int, clause: dict) -> str:
+    return f"\nClause {number} (Source: {format_citation(clause)}):\n{clause['text']}\n"
+
+
+def render_context(clauses: list) -> str:
+    return "".join(format_clause(i, c) for i, c in enumerate(clauses, start=1))
+
+
+# -------------------------------------------------
+# Merging
+# -------------------------------------------------
+def _has_span(clause: dict) -> bool:
+    start, end = clause.get("start"), clause.get("end")
+    return isinstance(start, int) and isinstance(end, int) and len(clause["text"]) == end - start
+
+
+def _add_sources(clause: dict, sources: list):
+    merged = list(chunk_sources(clause))
+    merged.extend(s for s in sources if s not in merged)
+    if len(merged) > 1:
+        clause["source_files"] = merged
+
+
+def _overlaps(a: dict, b: dict) -> bool:
+    return a["start"] <= b["end"] and b["start"] <= a["end"]
+
+
+def _absorb(target: dict, clause: dict):
+    """Extends target's span and text by an overlapping clause from the same source."""
+    if clause["start"] < target["start"]:
+        target["text"] = clause["text"][:target["start"] - clause["start"]] + target["text"]
+        target["start"] = clause["start"]
+    if clause["end"] > target["end"]:
+        target["text"] += clause["text"][target["end"] - clause["start"]:]
+        target["end"] = clause["end"]
+
+    pages = [p for p in (target.get("page_start"), clause.get("page_start")) if p is not None]
+    if pages:
+        target["page_start"] = min(pages)
+    pages = [p for p in (target.get("page_end"), clause.get("page_end")) if p is not None]
+    if pages:
+        target["page_end"] = max(pages)
+    target["merged_chunk_ids"].extend(clause["merged_chunk_ids"])
+
+
+def merge_clauses(clauses: list) -> list:
+    """
+    Joins clauses from the same source whose start/end character spans
+    overlap or touch into one clause, so the overlap between neighbouring
+    chunks appears once. A clause whose text is already contained in a
+    kept clause is dropped (its sources are added to that clause's
+    citation). Clauses keep the rank of their best-ranked part.
+    """
+    merged = []
+    by_source = {}
+
+    for clause in clauses:
+        clause = {**clause, "merged_chunk_ids": [clause.get("chunk_id")]}
+
+        if _has_span(clause):
+            spans = by_source.setdefault(clause.get("source_file"), [])
+            overlapping = [m for m in spans if _overlaps(m, clause)]
+            if overlapping:
+                # The best-ranked overlapping clause takes in the new one,
+                # and then any others the wider span now bridges to
+                target = min(overlapping, key=merged.index)
+                _absorb(target, clause)
+                others = [m for m in spans if m is not target and _overlaps(m, target)]
+                while others:
+                    for other in others:
+                        _absorb(target, other)
+                        spans.remove(other)
+                        merged.remove(other)
+                    others = [m for m in spans if m is not target and _overlaps(m, target)]
+                continue
+
+        text = clause["text"].strip()
+        duplicate_of = next((m for m in merged if text in m["text"]), None)
+        if duplicate_of is not None:
+            _add_sources(duplicate_of, chunk_sources(clause))
+            continue
+
+        merged.append(clause)
+        if _has_span(clause):
+            by_source.setdefault(clause.get("source_file"), []).append(clause)
+
+    return merged
+
+
+# -------------------------------------------------
+# Budgeting
+# -------------------------------------------------
+@dataclass
+class ContextStats:
+    prompts: int = 0
+    tokens_verbatim: int = 0
+    tokens_assembled: int = 0
+    clauses_merged: int = 0
+    clauses_truncated: int = 0
+    clauses_dropped: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.tokens_verbatim - self.tokens_assembled
+
+    def record(self, other: "ContextStats"):
+        with self._lock:
+            self.prompts += other.prompts
+            self.tokens_verbatim += other.tokens_verbatim
+            self.tokens_assembled += other.tokens_assembled
+            self.clauses_merged += other.clauses_merged
+            self.clauses_truncated += other.clauses_truncated
+            self.clauses_dropped += other.clauses_dropped
+
+    def summary(self) -> str:
+        share = self.tokens_saved / self.tokens_verbatim if self.tokens_verbatim else 0.0
+        return (
+            f"{self.prompts} prompts, context {self.tokens_verbatim} -> {self.tokens_assembled} tokens "
+            f"({self.tokens_saved} saved, {share:.1%}); "
+            f"{self.clauses_merged} clauses merged, {self.clauses_truncated} truncated, "
+            f"{self.clauses_dropped} dropped for budget"
+        )
+
+
+def assemble_context(clauses: list, max_tokens: int = None, encoding=None):
+    """
+    merge_clauses(), then keeps clauses in rank order while the rendered
+    context fits max_tokens (None: no limit). The clause that crosses the
+    budget is cut to fit, or dropped if fewer than MIN_CLAUSE_TOKENS
+    would be left; everything after it is dropped.
+
+    Returns (clauses, ContextStats) for this one prompt.
+    """
+    encoding = encoding or get_encoding()
+    merged = merge_clauses(clauses)
+
+    stats = ContextStats(
+        prompts=1,
+        tokens_verbatim=count_tokens(render_context(clauses), encoding),
+        clauses_merged=len(clauses) - len(merged)
+    )
+
+    kept = []
+    used = 0
+    for clause in merged:
+        tokens = count_tokens(format_clause(len(kept) + 1, clause), encoding)
+        if max_tokens is None or used + tokens <= max_tokens:
+            kept.append(clause)
+            used += tokens
+            continue
+
+        header = count_tokens(format_clause(len(kept) + 1, {**clause, "text": ""}), encoding)
+        room = max_tokens - used - header - 1  # " ..."
+        if room >= MIN_CLAUSE_TOKENS:
+            text_tokens = encoding.encode(clause["text"], disallowed_special=())
+            kept.append({**clause, "text": encoding.decode(text_tokens[:room]).rstrip() + " ...", "truncated": True})
+            stats.clauses_truncated += 1
+        stats.clauses_dropped = len(merged) - len(kept)
+        break
+
+    stats.tokens_assembled = count_tokens(render_context(kept), encoding)
+    return kept, stats
@@ -0,0 +1,83 @@
+import json
+
+REQUIRED_FIELDS = [
+    "coverage_decision",
+    "conditions_or_exclusions",
+    "evidence_sources",
+    "confidence"
+]
+
+
+def classify_json_error(raw_output: str):
+    if raw_output is None:
+        return "ERR-UNKNOWN"
+
+    # Truncated JSON detection
+    if raw_output.count("{") != raw_output.count("}"):
+        return "ERR-JSON-02"
+
+    # Markdown wrapper detection
+    if "```" in raw_output:
+        return "ERR-JSON-01"
+
+    return "ERR-JSON-01"
+
+
+def validate_schema(parsed_json: dict):
+    for field in REQUIRED_FIELDS:
+        if field not in parsed_json:
+            return False
+    return True
+
+
+# -------------------------------------------------
+# Per-claim evaluation (shared by serial and async runners)
+# -------------------------------------------------
+def evaluate_claim(claim: dict, reason_fn) -> dict:
+    """
+    Runs reason_fn(claim_text, clauses) for one claim and classifies the
+    outcome into a batch-eval result row. Never raises: runtime failures
+    are recorded as ERR-RUNTIME-01, and a None answer (no output in the
+    required schema, e.g. an abandoned off-schema stream) as ERR-SCHEMA-01.
+    """
+    error_type = None
+    raw_response = None
+    parsed = None
+
+    try:
+        raw_response = reason_fn(claim["claim_text"], claim.get("clauses"))
+
+        if raw_response is None:
+            error_type = "ERR-SCHEMA-01"
+        else:
+            try:
+                parsed = json.loads(raw_response)
+
+                if not validate_schema(parsed):
+                    error_type = "ERR-SCHEMA-01"
+
+            except json.JSONDecodeError:
+                error_type = classify_json_error(raw_response)
+
+    except Exception as e:
+        error_type = "ERR-RUNTIME-01"
+        raw_response = str(e)
+
+    if error_type:
+        return {
+            "claim_id": claim["claim_id"],
+            "insurer": claim.get("insurer"),
+            "coverage_decision": "ERROR",
+            "confidence": None,
+            "error_type": error_type,
+            "raw_llm_output": raw_response
+        }
+
+    return {
+        "claim_id": claim["claim_id"],
+        "insurer": claim.get("insurer"),
+        "coverage_decision": parsed.get("coverage_decision"),
+        "confidence": parsed.get("confidence"),
+        "error_type": None,
+        "raw_llm_output": None
+    }
@@ -0,0 +1,192 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600
+
+# Truncated answers and streams abandoned as off-schema are never cached
+UNCACHED_FINISH_REASONS = ("length", "off_schema")
+
+
+def request_fingerprint(model: str, messages: list, temperature=None, response_format=None) -> str:
+    """sha256 over everything that determines the answer to a chat request."""
+    payload = json.dumps(
+        {
+            "model": model,
+            "temperature": temperature,
+            "response_format": response_format,
+            "messages": messages,
+        },
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    Single-file SQLite cache of chat completion outputs keyed by
+    request_fingerprint(). Entries older than ttl_seconds count as
+    misses; evict() drops expired rows and then the least recently
+    used ones until the stored responses fit max_bytes.
+
+    Safe to share between the threads of the async engine.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES,
+                 ttl_seconds: float = DEFAULT_TTL_SECONDS):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                fingerprint TEXT PRIMARY KEY,
+                model TEXT NOT NULL,
+                response TEXT NOT NULL,
+                created REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses (last_used)")
+        self.conn.commit()
+
+    # -------------------------------------------------
+    def get(self, fingerprint: str):
+        """Cached response text, or None on a miss (or an expired entry)."""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT response FROM responses WHERE fingerprint = ? AND created >= ?",
+                (fingerprint, now - self.ttl_seconds)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            self.conn.execute("UPDATE responses SET last_used = ? WHERE fingerprint = ?", (now, fingerprint))
+            self.conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, fingerprint: str, model: str, response: str):
+        now = time.time()
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses (fingerprint, model, response, created, last_used) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (fingerprint, model, response, now, now)
+            )
+            self.conn.commit()
+
+    # -------------------------------------------------
+    def size_bytes(self) -> int:
+        with self._lock:
+            row = self.conn.execute("SELECT COALESCE(SUM(LENGTH(response)), 0) FROM responses").fetchone()
+        return row[0]
+
+    def __len__(self):
+        with self._lock:
+            return self.conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drops expired rows, then least recently used rows until the cache fits max_bytes."""
+        with self._lock:
+            expired = self.conn.execute(
+                "DELETE FROM responses WHERE created < ?", (time.time() - self.ttl_seconds,)
+            ).rowcount
+
+            excess = self.conn.execute(
+                "SELECT COALESCE(SUM(LENGTH(response)), 0) FROM responses"
+            ).fetchone()[0] - self.max_bytes
+
+            doomed = []
+            freed = 0
+            if excess > 0:
+                rows = self.conn.execute(
+                    "SELECT rowid, LENGTH(response) FROM responses ORDER BY last_used ASC"
+                )
+                for rowid, size in rows:
+                    if freed >= excess:
+                        break
+                    doomed.append((rowid,))
+                    freed += size
+
+            self.conn.executemany("DELETE FROM responses WHERE rowid = ?", doomed)
+            self.conn.commit()
+        return expired + len(doomed)
+
+    # -------------------------------------------------
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(self),
+            "size_bytes": self.size_bytes()
+        }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        return (
+            f"hit rate {stats['hit_rate']:.1%} ({stats['hits']} hits / {stats['misses']} misses), "
+            f"{stats['entries']} entries, {stats['size_bytes'] / 1e6:.1f} MB"
+        )
+
+    def close(self):
+        with self._lock:
+            self.conn.close()
+
+
+# -------------------------------------------------
+def create_chat_completion(client, **request):
+    """Plain chat.completions.create(); returns (content, finish_reason)."""
+    choice = client.chat.completions.create(**request).choices[0]
+    return choice.message.content, getattr(choice, "finish_reason", None)
+
+
+def cached_chat_completion(client, cache=None, bypass: bool = False, call=create_chat_completion,
+                           **request) -> str:
+    """
+    call(client, **request) -> (content, finish_reason), returning the
+    content, served from / stored in cache. bypass skips the lookup but
+    still stores the fresh response. Responses with a finish_reason in
+    UNCACHED_FINISH_REASONS, or without content (refusals), are not
+    cached.
+    """
+    if cache is None:
+        return call(client, **request)[0]
+
+    fingerprint = request_fingerprint(
+        request["model"],
+        request["messages"],
+        request.get("temperature"),
+        request.get("response_format")
+    )
+    if not bypass:
+        content = cache.get(fingerprint)
+        if content is not None:
+            return content
+
+    content, finish_reason = call(client, **request)
+    if content is not None and finish_reason not in UNCACHED_FINISH_REASONS:
+        cache.put(fingerprint, request["model"], content)
+    return content
@@ -0,0 +1,210 @@
+import json
+import threading
+import time
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from src.reasoning.output_validation import REQUIRED_FIELDS
+from src.utils.tokens import count_tokens, get_model_encoding
+
+DEFAULT_MAX_ATTEMPTS = 2
+
+# finish_reason reported for a stream abandoned as off-schema
+OFF_SCHEMA = "off_schema"
+
+
+class OffSchemaOutput(ValueError):
+    pass
+
+
+# -------------------------------------------------
+# Incremental parser
+# -------------------------------------------------
+class IncrementalJSONParser:
+    """
+    Consumes a JSON object a piece at a time (as streamed tokens arrive)
+    and reports each top-level field as soon as its value is complete,
+    through on_field(name, value). Raises OffSchemaOutput as early as the
+    text can no longer be a valid answer: anything but whitespace before
+    the opening brace (markdown fences, prose), a malformed value, a
+    closing brace with required_fields still missing, or text after the
+    closing brace. Extra fields are allowed, as in validate_schema().
+    """
+
+    def __init__(self, on_field=None, required_fields=REQUIRED_FIELDS):
+        self.on_field = on_field
+        self.required_fields = set(required_fields)
+        self.fields = {}
+        self.done = False
+        self.text = ""
+
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = None          # "key" / "value" at depth 1
+        self._key = None
+        self._token_start = None     # start of the key or top-level value being read
+
+    def feed(self, piece: str):
+        self.text += piece
+        for ch in piece:
+            self._step(ch)
+            self._pos += 1
+
+    def _slice(self, end: int) -> str:
+        return self.text[self._token_start:end]
+
+    def _complete_value(self, end: int):
+        raw = self._slice(end)
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            raise OffSchemaOutput(f"malformed value for {self._key!r}: {raw[:40]!r}")
+        self.fields[self._key] = value
+        self._token_start = None
+        if self.on_field is not None:
+            self.on_field(self._key, value)
+
+    def _step(self, ch: str):
+        if self.done:
+            if not ch.isspace():
+                raise OffSchemaOutput("text after the JSON object")
+            return
+
+        if self._in_string:
+            if self._escape:
+                self._escape = False
+            elif ch == "\\":
+                self._escape = True
+            elif ch == '"':
+                self._in_string = False
+                if self._depth == 1 and self._expect == "key":
+                    self._key = json.loads(self._slice(self._pos + 1))
+                    self._token_start = None
+                elif self._depth == 1 and self._expect == "value":
+                    self._complete_value(self._pos + 1)
+            return
+
+        if self._depth == 0:
+            if ch == "{":
+                self._depth = 1
+                self._expect = "key"
+            elif not ch.isspace():
+                raise OffSchemaOutput(f"output does not start with a JSON object: {self.text[:20]!r}")
+            return
+
+        if ch == '"':
+            self._in_string = True
+            if self._depth == 1 and self._token_start is None:
+                self._token_start = self._pos
+        elif ch in "{[":
+            if self._depth == 1 and self._token_start is None:
+                self._token_start = self._pos
+            self._depth += 1
+        elif ch in "}]":
+            if self._depth == 1:
+                if self._token_start is not None:
+                    self._complete_value(self._pos)
+                self._depth = 0
+                self.done = True
+                missing = self.required_fields - set(self.fields)
+                if missing:
+                    raise OffSchemaOutput(f"missing fields {sorted(missing)}")
+                return
+            self._depth -= 1
+            if self._depth == 1:
+                self._complete_value(self._pos + 1)
+        elif self._depth == 1:
+            if ch == ":":
+                self._expect = "value"
+            elif ch == ",":
+                if self._token_start is not None:
+                    self._complete_value(self._pos)
+                self._expect = "key"
+            elif not ch.isspace() and self._token_start is None:
+                if self._expect != "value":
+                    raise OffSchemaOutput(f"unexpected {ch!r} where a field name belongs")
+                self._token_start = self._pos
+
+
+# -------------------------------------------------
+# Metrics
+# -------------------------------------------------
+@dataclass
+class StreamStats:
+    requests: int = 0
+    aborted: int = 0
+    wasted_tokens: int = 0
+    decision_seconds: list = field(default_factory=list)
+    completion_seconds: list = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def summary(self) -> str:
+        def p50(values):
+            return f"{np.percentile(values, 50) * 1000:.0f}ms" if values else "n/a"
+
+        return (
+            f"{self.requests} streamed requests, p50 time to decision {p50(self.decision_seconds)} "
+            f"vs full completion {p50(self.completion_seconds)}; "
+            f"{self.aborted} off-schema streams aborted ({self.wasted_tokens} tokens wasted)"
+        )
+
+
+# -------------------------------------------------
+def stream_chat_completion(client, on_field=None, max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+                           stats: StreamStats = None, **request):
+    """
+    chat.completions.create(stream=True, **request) parsed incrementally.
+    on_field(name, value) fires as each top-level field completes (so
+    coverage_decision is known before the rest of the answer arrives).
+    An off-schema stream is closed at once and the request retried, up to
+    max_attempts in total. Fields of an abandoned attempt may already have
+    been reported, so on_field can see a field again on the retry.
+
+    Returns (content, finish_reason). If the last attempt is abandoned too,
+    content is None and finish_reason is OFF_SCHEMA: the partial text is a
+    cut-off JSON prefix and would otherwise be classified as truncated
+    JSON instead of a schema failure.
+    """
+    for attempt in range(1, max_attempts + 1):
+        start = time.perf_counter()
+        decided = []
+
+        def on_parsed(name, value):
+            if name == "coverage_decision":
+                decided.append(time.perf_counter() - start)
+            if on_field is not None:
+                on_field(name, value)
+
+        parser = IncrementalJSONParser(on_parsed)
+        finish_reason = None
+        stream = client.chat.completions.create(stream=True, **request)
+
+        try:
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                choice = chunk.choices[0]
+                if choice.delta.content:
+                    parser.feed(choice.delta.content)
+                finish_reason = choice.finish_reason or finish_reason
+        except OffSchemaOutput:
+            if hasattr(stream, "close"):
+                stream.close()
+            if stats is not None:
+                with stats._lock:
+                    stats.aborted += 1
+                    stats.wasted_tokens += count_tokens(parser.text, get_model_encoding(request["model"]))
+            if attempt == max_attempts:
+                return None, OFF_SCHEMA
+            continue
+
+        if stats is not None:
+            with stats._lock:
+                stats.requests += 1
+                stats.completion_seconds.append(time.perf_counter() - start)
+                # Only completed attempts, so both p50s cover the same streams
+                stats.decision_seconds.extend(decided[:1])
+        return parser.text, finish_reason
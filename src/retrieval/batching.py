@@ -0,0 +1,144 @@
+from collections import Counter
+
+import numpy as np
+
+from src.utils.tokens import count_tokens, get_encoding
+
+
+def batch_by_tokens(texts: list, max_tokens: int, max_items: int, token_counts: list = None) -> list:
+    """
+    Groups text positions into consecutive batches whose summed token
+    count stays within max_tokens and whose length stays within max_items.
+
+    Returns a list of index lists, so callers can scatter results back
+    into the original order. Packing is greedy and order-preserving, so
+    the same inputs always produce the same batches.
+    """
+    if token_counts is None:
+        token_counts = [count_tokens(t) for t in texts]
+
+    batches = []
+    current = []
+    current_tokens = 0
+
+    for i, tokens in enumerate(token_counts):
+        if current and (current_tokens + tokens > max_tokens or len(current) >= max_items):
+            batches.append(current)
+            current = []
+            current_tokens = 0
+
+        current.append(i)
+        current_tokens += tokens
+
+    if current:
+        batches.append(current)
+
+    return batches
+
+
+def iter_record_batches(records, max_tokens: int, max_items: int, token_field: str = "token_count"):
+    """
+    Streaming form of batch_by_tokens over records that already carry
+    their token count (e.g. chunk records); records without one are
+    counted on the fly.
+    """
+    batch = []
+    batch_tokens = 0
+
+    for record in records:
+        tokens = record.get(token_field)
+        if tokens is None:
+            tokens = count_tokens(record["text"])
+
+        if batch and (batch_tokens + tokens > max_tokens or len(batch) >= max_items):
+            yield batch
+            batch = []
+            batch_tokens = 0
+
+        batch.append(record)
+        batch_tokens += tokens
+
+    if batch:
+        yield batch
+
+
+# -------------------------------------------------
+# Oversized inputs
+# -------------------------------------------------
+class OversizedInputError(ValueError):
+    pass
+
+
+def split_by_tokens(text: str, max_tokens: int) -> list:
+    """Splits text into consecutive pieces of at most max_tokens tokens."""
+    encoding = get_encoding()
+    tokens = encoding.encode(text, disallowed_special=())
+    return [
+        encoding.decode(tokens[i:i + max_tokens])
+        for i in range(0, len(tokens), max_tokens)
+    ]
+
+
+def plan_embedding_inputs(texts: list, max_input_tokens: int, on_oversized: str = "split",
+                          token_counts: list = None) -> tuple:
+    """
+    Checks every text against the per-input token limit up front.
+
+    on_oversized="reject" raises OversizedInputError naming the inputs
+    that are too long. on_oversized="split" breaks each one into pieces
+    that fit; the piece embeddings are recombined by combine_pieces.
+
+    Returns (pieces, owners, piece_tokens), where owners[i] is the index
+    in `texts` that piece i belongs to.
+    """
+    if token_counts is None:
+        token_counts = [count_tokens(t) for t in texts]
+
+    oversized = [i for i, tokens in enumerate(token_counts) if tokens > max_input_tokens]
+    if oversized and on_oversized == "reject":
+        raise OversizedInputError(
+            f"{len(oversized)} input(s) exceed {max_input_tokens} tokens: positions {oversized[:10]}"
+        )
+    if on_oversized not in ("reject", "split"):
+        raise ValueError(f"Unknown on_oversized policy: {on_oversized!r}")
+
+    pieces, owners, piece_tokens = [], [], []
+    for i, (text, tokens) in enumerate(zip(texts, token_counts)):
+        if tokens <= max_input_tokens:
+            pieces.append(text)
+            owners.append(i)
+            piece_tokens.append(tokens)
+            continue
+
+        for piece in split_by_tokens(text, max_input_tokens):
+            pieces.append(piece)
+            owners.append(i)
+            piece_tokens.append(count_tokens(piece))
+
+    return pieces, owners, piece_tokens
+
+
+def combine_pieces(piece_embeddings: list, owners: list, piece_tokens: list, num_inputs: int) -> list:
+    """
+    One embedding per original input. Split inputs get the
+    token-weighted mean of their pieces, re-normalized to unit length
+    like the API's own embeddings.
+    """
+    piece_counts = Counter(owners)
+    combined = [None] * num_inputs
+
+    for embedding, owner, tokens in zip(piece_embeddings, owners, piece_tokens):
+        if piece_counts[owner] == 1:
+            combined[owner] = embedding
+            continue
+
+        weighted = np.asarray(embedding, dtype="float32") * tokens
+        combined[owner] = weighted if combined[owner] is None else combined[owner] + weighted
+
+    for owner, count in piece_counts.items():
+        if count > 1:
+            norm = np.linalg.norm(combined[owner])
+            if norm:
+                combined[owner] = combined[owner] / norm
+
+    return combined
@@ -0,0 +1,176 @@
+import mmap
+import math
+import os
+import re
+import struct
+from array import array
+from collections import Counter
+
+import numpy as np
+
+# File layout (little-endian):
+#   header        MAGIC + (docs, terms, postings, vocab_length)
+#   term_offsets  (terms + 1) int64: term i's postings are [offsets[i], offsets[i + 1])
+#   doc_lengths   docs int32 (tokens per chunk)
+#   doc_ids       postings int32, metadata row of each posting
+#   term_freqs    postings uint16 (clipped)
+#   vocab         terms joined with "\n", in term id order
+MAGIC = b"PBM25V01"
+HEADER = struct.Struct("<8s4Q")
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the this "
+    "to was were will with shall any such which who under".split()
+)
+
+
+def tokenize(text: str):
+    return [t for t in TOKEN_PATTERN.findall(text.lower()) if t not in STOPWORDS]
+
+
+class BM25IndexWriter:
+    """
+    Builds the inverted index for a chunk corpus, one add() per metadata
+    row and in the same order. Postings are kept in memory as compact
+    arrays; the file is written atomically on close.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.count = 0
+
+        self._term_ids = {}
+        self._doc_ids = []
+        self._term_freqs = []
+        self._doc_lengths = array("i")
+
+    def add(self, text: str):
+        tokens = tokenize(text)
+        for term, freq in Counter(tokens).items():
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = self._term_ids[term] = len(self._term_ids)
+                self._doc_ids.append(array("i"))
+                self._term_freqs.append(array("H"))
+            self._doc_ids[term_id].append(self.count)
+            self._term_freqs[term_id].append(min(freq, 0xFFFF))
+
+        self._doc_lengths.append(len(tokens))
+        self.count += 1
+
+    def add_many(self, texts):
+        for text in texts:
+            self.add(text)
+
+    def close(self, commit: bool = True):
+        if not commit:
+            return
+
+        terms = list(self._term_ids)
+        offsets = array("q", [0])
+        for doc_ids in self._doc_ids:
+            offsets.append(offsets[-1] + len(doc_ids))
+        vocab = "\n".join(terms).encode("utf-8")
+
+        with open(self.tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, self.count, len(terms), offsets[-1], len(vocab)))
+            f.write(offsets.tobytes())
+            f.write(self._doc_lengths.tobytes())
+            for doc_ids in self._doc_ids:
+                f.write(doc_ids.tobytes())
+            for term_freqs in self._term_freqs:
+                f.write(term_freqs.tobytes())
+            f.write(vocab)
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+
+class BM25Index:
+    """
+    Memory-mapped BM25 index. search() returns metadata rows, best first.
+    """
+
+    def __init__(self, path: str, k1: float = BM25_K1, b: float = BM25_B):
+        self.path = path
+        self.k1 = k1
+        self.b = b
+
+        self._mmap = None
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, docs, terms, postings, vocab_length = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a BM25 index")
+
+        offset = HEADER.size
+        self._term_offsets = np.frombuffer(self._mmap, dtype=np.int64, count=terms + 1, offset=offset)
+        offset += (terms + 1) * 8
+        self._doc_lengths = np.frombuffer(self._mmap, dtype=np.int32, count=docs, offset=offset)
+        offset += docs * 4
+        self._doc_ids = np.frombuffer(self._mmap, dtype=np.int32, count=postings, offset=offset)
+        offset += postings * 4
+        self._term_freqs = np.frombuffer(self._mmap, dtype=np.uint16, count=postings, offset=offset)
+        offset += postings * 2
+
+        vocab = self._mmap[offset:offset + vocab_length].decode("utf-8")
+        self._term_ids = {term: i for i, term in enumerate(vocab.split("\n"))} if vocab_length else {}
+
+        self.docs = docs
+        average_length = self._doc_lengths.mean() if docs else 1.0
+        self._length_norm = self.k1 * (1 - self.b + self.b * self._doc_lengths / max(average_length, 1.0))
+
+    def __len__(self):
+        return self.docs
+
+    def scores(self, text: str):
+        """BM25 score of every row for the query text."""
+        scores = np.zeros(self.docs, dtype=np.float32)
+        for term in set(tokenize(text)):
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                continue
+
+            start, end = self._term_offsets[term_id], self._term_offsets[term_id + 1]
+            doc_ids = self._doc_ids[start:end]
+            tf = self._term_freqs[start:end].astype(np.float32)
+
+            idf = math.log(1 + (self.docs - len(doc_ids) + 0.5) / (len(doc_ids) + 0.5))
+            scores[doc_ids] += idf * tf * (self.k1 + 1) / (tf + self._length_norm[doc_ids])
+        return scores
+
+    def search(self, text: str, k: int, rows=None):
+        """
+        Up to k rows with a positive score, best first. rows restricts the
+        candidates (e.g. an insurer shard).
+        """
+        scores = self.scores(text)
+        if rows is not None:
+            mask = np.zeros(self.docs, dtype=bool)
+            mask[rows] = True
+            scores[~mask] = 0
+
+        hits = np.flatnonzero(scores > 0)
+        if len(hits) > k:
+            hits = hits[np.argpartition(-scores[hits], k - 1)[:k]]
+        return [int(row) for row in hits[np.argsort(-scores[hits], kind="stable")]]
+
+    def close(self):
+        if self._mmap is not None:
+            self._term_offsets = self._doc_lengths = self._doc_ids = self._term_freqs = None
+            self._mmap.close()
+            self._mmap = None
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,41 @@
+import re
+
+PAGE_REFERENCE = re.compile(r"\bpp?\.\s*(\d+)(?:\s*[-–]\s*(\d+))?", re.IGNORECASE)
+
+
+def page_label(chunk: dict) -> str:
+    """'p. 4' / 'pp. 4-5' for a chunk record, or '' when pages are unknown."""
+    page_start = chunk.get("page_start")
+    page_end = chunk.get("page_end")
+
+    if page_start is None:
+        return ""
+    if page_end is None or page_end == page_start:
+        return f"p. {page_start}"
+    return f"pp. {page_start}-{page_end}"
+
+
+def chunk_sources(chunk: dict) -> list:
+    """All files a (possibly deduplicated) chunk appears in, canonical first."""
+    return chunk.get("source_files") or [chunk.get("source_file")]
+
+
+def format_citation(chunk: dict) -> str:
+    label = page_label(chunk)
+    source = chunk.get("source_file")
+    citation = f"{source}, {label}" if label else f"{source}"
+
+    also_in = chunk_sources(chunk)[1:]
+    if also_in:
+        citation += f"; same text also in: {', '.join(also_in)}"
+    return citation
+
+
+def cited_pages(reference: str) -> set:
+    """Page numbers mentioned in a free-text citation such as 'X.pdf, pp. 3-4'."""
+    pages = set()
+    for match in PAGE_REFERENCE.finditer(reference):
+        first = int(match.group(1))
+        last = int(match.group(2)) if match.group(2) else first
+        pages.update(range(first, last + 1))
+    return pages
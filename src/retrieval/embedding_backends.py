@@ -0,0 +1,156 @@
+import os
+import re
+import zlib
+from abc import ABC, abstractmethod
+
+import numpy as np
+import openai
+
+from src.retrieval.batching import batch_by_tokens
+
+# Selected backend for both index building and query time
+EMBEDDING_BACKEND = os.getenv("EMBEDDING_BACKEND", "openai")
+
+BACKENDS = {}
+
+
+class EmbeddingBackendMismatch(ValueError):
+    pass
+
+
+def register_backend(name: str):
+    def decorator(cls):
+        if getattr(cls, "__abstractmethods__", None):
+            raise TypeError(
+                f"Embedding backend {name!r} ({cls.__name__}) does not implement: "
+                f"{', '.join(sorted(cls.__abstractmethods__))}"
+            )
+        cls.name = name
+        BACKENDS[name] = cls
+        return cls
+    return decorator
+
+
+def get_backend(name: str = None, **options):
+    name = name or EMBEDDING_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {name!r}; registered: {sorted(BACKENDS)}")
+    return BACKENDS[name](**options)
+
+
+class EmbeddingBackend(ABC):
+    """
+    Turns texts into float32 vectors. identity() is stored with the index
+    at build time and must match at query time, because vectors from
+    different backends, models or settings are not comparable.
+    """
+
+    name = None
+    is_remote = False
+
+    @abstractmethod
+    def identity(self) -> dict:
+        ...
+
+    @property
+    @abstractmethod
+    def cache_key(self) -> str:
+        """Model key used for the embedding cache."""
+
+    @abstractmethod
+    def embed(self, texts: list) -> np.ndarray:
+        ...
+
+    def embed_query(self, text: str) -> np.ndarray:
+        return self.embed([text])[0]
+
+
+# -------------------------------------------------
+# OpenAI embeddings API
+# -------------------------------------------------
+@register_backend("openai")
+class OpenAIEmbeddingBackend(EmbeddingBackend):
+    is_remote = True
+
+    def __init__(self, model: str = "text-embedding-3-small", client=None,
+                 max_batch_tokens: int = 100_000, max_batch_items: int = 2048):
+        self.model = model
+        self.client = client if client is not None else openai
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_items = max_batch_items
+
+    def identity(self) -> dict:
+        return {"backend": self.name, "model": self.model}
+
+    @property
+    def cache_key(self) -> str:
+        return self.model
+
+    def embed_query(self, text: str) -> np.ndarray:
+        response = self.client.embeddings.create(model=self.model, input=text)
+        return np.array(response.data[0].embedding).astype("float32")
+
+    def embed(self, texts: list) -> np.ndarray:
+        vectors = [None] * len(texts)
+
+        for batch in batch_by_tokens(texts, self.max_batch_tokens, self.max_batch_items):
+            response = self.client.embeddings.create(
+                model=self.model,
+                input=[texts[i] for i in batch]
+            )
+            for item in sorted(response.data, key=lambda d: d.index):
+                vectors[batch[item.index]] = item.embedding
+
+        return np.array(vectors).astype("float32")
+
+
+# -------------------------------------------------
+# Offline CPU backend
+# -------------------------------------------------
+@register_backend("hashing")
+class HashingEmbeddingBackend(EmbeddingBackend):
+    """
+    Hashed character n-gram embeddings in NumPy: no model file, no
+    fitting, no network. Each n-gram is hashed (crc32) into one of `dim`
+    signed buckets. Counts are log-scaled and the vector is L2-normalized,
+    so cosine / L2 ranking works as it does for API embeddings.
+    Intended for offline benchmarking and development without API access.
+    """
+
+    def __init__(self, dim: int = 1024, ngram_range: tuple = (3, 5), client=None):
+        self.dim = dim
+        self.ngram_range = tuple(ngram_range)
+
+    def identity(self) -> dict:
+        return {"backend": self.name, "dim": self.dim, "ngram_range": list(self.ngram_range)}
+
+    @property
+    def cache_key(self) -> str:
+        low, high = self.ngram_range
+        return f"hashing:{self.dim}:{low}-{high}"
+
+    def _embed_one(self, text: str) -> np.ndarray:
+        text = " " + re.sub(r"\s+", " ", text.lower()).strip() + " "
+        low, high = self.ngram_range
+
+        hashes = [
+            zlib.crc32(text[i:i + n].encode("utf-8"))
+            for n in range(low, high + 1)
+            for i in range(len(text) - n + 1)
+        ]
+        if not hashes:
+            return np.zeros(self.dim, dtype="float32")
+
+        hashes = np.array(hashes, dtype=np.uint64)
+        buckets = (hashes % self.dim).astype(np.int64)
+        signs = np.where((hashes >> 31) & 1, -1.0, 1.0)
+
+        vector = np.bincount(buckets, weights=signs, minlength=self.dim)
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).astype("float32")
+
+    def embed(self, texts: list) -> np.ndarray:
+        if not texts:
+            return np.zeros((0, self.dim), dtype="float32")
+        return np.vstack([self._embed_one(t) for t in texts])
@@ -0,0 +1,135 @@
+import hashlib
+import os
+import sqlite3
+import time
+
+import numpy as np
+
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB of vectors
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Single-file SQLite cache of embeddings keyed by
+    (embedding model, sha256 of the input text).
+
+    Vectors are stored as raw float32 blobs. When the stored vectors
+    exceed max_bytes, the least recently used rows are evicted.
+    """
+
+    def __init__(self, path: str, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            )
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_last_used ON embeddings (last_used)")
+        self.conn.commit()
+
+    # -------------------------------------------------
+    def get_many(self, model: str, texts: list) -> list:
+        """Returns one float32 vector (or None on a miss) per text."""
+        hashes = [text_hash(t) for t in texts]
+        found = {}
+
+        # Stay under SQLite's bound-parameter limit
+        for i in range(0, len(hashes), 500):
+            chunk = hashes[i:i + 500]
+            placeholders = ",".join("?" * len(chunk))
+            rows = self.conn.execute(
+                f"SELECT text_hash, vector FROM embeddings WHERE model = ? AND text_hash IN ({placeholders})",
+                [model, *chunk]
+            ).fetchall()
+            for h, blob in rows:
+                found[h] = np.frombuffer(blob, dtype="float32")
+
+        now = time.time()
+        self.conn.executemany(
+            "UPDATE embeddings SET last_used = ? WHERE model = ? AND text_hash = ?",
+            [(now, model, h) for h in found]
+        )
+        self.conn.commit()
+
+        results = [found.get(h) for h in hashes]
+        hit_count = sum(1 for r in results if r is not None)
+        self.hits += hit_count
+        self.misses += len(results) - hit_count
+        return results
+
+    def put_many(self, model: str, texts: list, vectors: list):
+        now = time.time()
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO embeddings (model, text_hash, vector, last_used) VALUES (?, ?, ?, ?)",
+            [
+                (model, text_hash(t), np.asarray(v, dtype="float32").tobytes(), now)
+                for t, v in zip(texts, vectors)
+            ]
+        )
+        self.conn.commit()
+
+    # -------------------------------------------------
+    def size_bytes(self) -> int:
+        row = self.conn.execute("SELECT COALESCE(SUM(LENGTH(vector)), 0) FROM embeddings").fetchone()
+        return row[0]
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+    def evict(self) -> int:
+        """Drops least recently used rows until the cache fits max_bytes."""
+        excess = self.size_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+
+        evicted = 0
+        freed = 0
+        rows = self.conn.execute(
+            "SELECT rowid, LENGTH(vector) FROM embeddings ORDER BY last_used ASC"
+        )
+        doomed = []
+        for rowid, size in rows:
+            if freed >= excess:
+                break
+            doomed.append((rowid,))
+            freed += size
+            evicted += 1
+
+        self.conn.executemany("DELETE FROM embeddings WHERE rowid = ?", doomed)
+        self.conn.commit()
+        return evicted
+
+    # -------------------------------------------------
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hit_rate,
+            "entries": len(self),
+            "size_bytes": self.size_bytes()
+        }
+
+    def close(self):
+        self.conn.close()
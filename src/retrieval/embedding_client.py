@@ -0,0 +1,193 @@
+import asyncio
+import random
+import time
+from dataclasses import dataclass
+
+import openai
+
+from src.utils.tokens import count_tokens
+
+RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = (
+    openai.RateLimitError,
+    openai.APITimeoutError,
+    openai.APIConnectionError,
+    openai.InternalServerError,
+)
+
+
+def is_retryable(exc: Exception) -> bool:
+    if isinstance(exc, RETRYABLE_ERRORS):
+        return True
+    return getattr(exc, "status_code", None) in RETRYABLE_STATUS
+
+
+def retry_after_seconds(exc: Exception):
+    """Retry-After hint from an API error response, if there is one."""
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except ValueError:
+        return None
+
+
+# -------------------------------------------------
+# Rate limiting
+# -------------------------------------------------
+class TokenBucket:
+    """
+    Continuous-refill token bucket for a per-minute quota.
+
+    It is only used from one event loop, so check-and-take runs without
+    an await in between and needs no lock. That also lets one bucket be
+    reused across several asyncio.run() calls.
+    """
+
+    def __init__(self, per_minute: float, capacity: float = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        while True:
+            self._refill()
+            if self.tokens >= amount:
+                self.tokens -= amount
+                return
+            await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+# -------------------------------------------------
+# Stats
+# -------------------------------------------------
+@dataclass
+class EmbeddingStats:
+    embeddings: int = 0
+    requests: int = 0
+    retries: int = 0
+    cached: int = 0
+    seconds: float = 0.0
+
+    @property
+    def embeddings_per_sec(self) -> float:
+        return self.embeddings / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.embeddings} embeddings in {self.seconds:.2f}s "
+            f"({self.embeddings_per_sec:.1f}/s), {self.requests} requests, "
+            f"{self.retries} retries, {self.cached} served from cache"
+        )
+
+
+# -------------------------------------------------
+# Client
+# -------------------------------------------------
+class AsyncEmbeddingClient:
+    """
+    Embeds batches of texts with up to max_concurrency requests in
+    flight. Requests/min and tokens/min are limited with token buckets.
+    Retryable API errors are retried with exponential backoff plus
+    jitter, honouring Retry-After when the API sends it.
+
+    If a cache is given, every finished batch is written to it right
+    away. A rebuild that died part-way then resumes from the last
+    completed batch: those batches are cache hits on the next run.
+
+    The limiters and stats persist across embed_batches() calls. The
+    async OpenAI client is opened per call, so each asyncio.run() gets a
+    client bound to its own loop.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_concurrency: int = 4,
+        requests_per_minute: float = 3000,
+        tokens_per_minute: float = 1_000_000,
+        max_retries: int = 6,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0,
+        cache=None,
+        client_factory=None
+    ):
+        self.model = model
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.cache = cache
+        # max_retries=0: the SDK's own retries would bypass the token
+        # buckets and stats, and multiply with the retry loop below
+        self.client_factory = client_factory or (
+            lambda: openai.AsyncOpenAI(api_key=openai.api_key, max_retries=0)
+        )
+
+        self.request_bucket = TokenBucket(requests_per_minute)
+        self.token_bucket = TokenBucket(tokens_per_minute)
+        self.stats = EmbeddingStats()
+
+    def backoff_delay(self, attempt: int, exc: Exception) -> float:
+        hinted = retry_after_seconds(exc)
+        if hinted is not None:
+            return min(hinted, self.max_delay)
+        delay = min(self.max_delay, self.base_delay * (2 ** attempt))
+        return delay * random.uniform(0.5, 1.0)
+
+    async def _embed_batch(self, client, semaphore, batch: list, token_count: int) -> list:
+        async with semaphore:
+            for attempt in range(self.max_retries + 1):
+                await self.request_bucket.acquire(1)
+                await self.token_bucket.acquire(token_count)
+
+                try:
+                    self.stats.requests += 1
+                    response = await client.embeddings.create(model=self.model, input=batch)
+                    break
+                except Exception as exc:
+                    if attempt == self.max_retries or not is_retryable(exc):
+                        raise
+                    self.stats.retries += 1
+                    await asyncio.sleep(self.backoff_delay(attempt, exc))
+
+        embeddings = [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+        if self.cache is not None:
+            self.cache.put_many(self.model, batch, embeddings)
+
+        self.stats.embeddings += len(embeddings)
+        return embeddings
+
+    async def embed_batches(self, batches: list, token_counts: list = None) -> list:
+        """Embeds each batch (a list of texts); returns one vector list per batch, in order."""
+        if token_counts is None:
+            token_counts = [sum(count_tokens(t) for t in batch) for batch in batches]
+
+        start = time.perf_counter()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        client = self.client_factory()
+
+        try:
+            return await asyncio.gather(*[
+                self._embed_batch(client, semaphore, batch, tokens)
+                for batch, tokens in zip(batches, token_counts)
+            ])
+        finally:
+            self.stats.seconds += time.perf_counter() - start
+            close = getattr(client, "close", None)
+            if close is not None:
+                result = close()
+                if asyncio.iscoroutine(result):
+                    await result
+
+    def embed_batches_sync(self, batches: list, token_counts: list = None) -> list:
+        return asyncio.run(self.embed_batches(batches, token_counts))
@@ -0,0 +1,64 @@
+import numpy as np
+
+# "vector":    dense FAISS search only
+# "hybrid":    dense and BM25 candidates fused with reciprocal rank fusion
+# "prefilter": BM25 picks candidate chunks, FAISS ranks only those
+RETRIEVAL_MODES = ("vector", "hybrid", "prefilter")
+
+RRF_K = 60
+HYBRID_CANDIDATES = 50
+PREFILTER_CANDIDATES = 200
+
+
+def reciprocal_rank_fusion(rankings, limit: int, k: int = RRF_K):
+    """Fuses ranked row lists: score(row) = sum(1 / (k + rank)). Ties keep first-seen order."""
+    scores = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, start=1):
+            scores[row] = scores.get(row, 0.0) + 1.0 / (k + rank)
+    return sorted(scores, key=lambda row: -scores[row])[:limit]
+
+
+def vector_rows(index, query_vectors, k: int, rows=None):
+    _, indices = index.search(query_vectors, k, rows=rows)
+    return [[int(i) for i in row if i >= 0] for row in indices]
+
+
+def search_rows(index, query_vectors, k: int, rows=None, lexical=None, query_texts=None, mode="vector"):
+    """
+    Top-k metadata rows per query for the given retrieval mode; without a
+    lexical (BM25) index every mode is plain vector search. rows restricts
+    both sides to a shard. Queries that find nothing (in the shard, or
+    among the lexical candidates) fall back to a global vector search.
+    """
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode {mode!r}; expected one of {RETRIEVAL_MODES}")
+    if len(query_vectors) == 0:
+        return []
+
+    if lexical is None or mode == "vector":
+        results = vector_rows(index, query_vectors, k, rows)
+
+    elif mode == "hybrid":
+        dense = vector_rows(index, query_vectors, HYBRID_CANDIDATES, rows)
+        results = [
+            reciprocal_rank_fusion([ranking, lexical.search(text, HYBRID_CANDIDATES, rows)], k)
+            for ranking, text in zip(dense, query_texts)
+        ]
+
+    else:
+        results = []
+        for vector, text in zip(query_vectors, query_texts):
+            candidates = lexical.search(text, PREFILTER_CANDIDATES, rows)
+            if not candidates:
+                results.append([])
+                continue
+            results.append(vector_rows(index, vector[None, :], k, np.array(candidates))[0])
+
+    empty = [i for i, found in enumerate(results) if not found]
+    if empty and (rows is not None or mode == "prefilter"):
+        fallback = vector_rows(index, query_vectors[empty], k)
+        for i, found in zip(empty, fallback):
+            results[i] = found
+
+    return results
@@ -0,0 +1,89 @@
+import re
+
+# -------------------------------------------------
+# Insurer / scheme -> policy documents
+# -------------------------------------------------
+# Keys match the insurer names used by scripts/generate_synthetic_claims.py.
+# Government schemes include the NHA operational guidelines that apply to them.
+INSURER_SOURCE_FILES = {
+    "ICICI Lombard": [
+        "ICICI Lombard.pdf",
+        "Arogya Sanjeevani Policy ICICI Lombard.pdf",
+        "Corporate Advantage Super Top Up Policy ICICI.pdf",
+        "Family Shield Policy ICICI Lombard.pdf",
+        "Hospifund Insurance Policy ICICI.pdf",
+        "Womens Cancer Shield Policy ICICI.pdf",
+    ],
+    "HDFC ERGO": ["HDFC Ergo General Insurance.pdf"],
+    "SBI General Insurance": ["SBI Group Health Insurance.pdf"],
+    "A Plus Health Insurance": ["A Plus Health Insurance.pdf"],
+    "Alliance Health Insurance": ["Allaince Health Insurance.pdf"],
+    "Reliance General Insurance": ["Reliance Specially Abled Health Insurance.pdf"],
+    "Royal Sundaram": ["ROYAL SUNDARAM Multiplier Health Insurance Policy.pdf"],
+    "Universal Sompo": ["UNIVERSAL SOMPO Individual Health Insurance Policy.pdf"],
+    "Emedlife": ["Emedlife Parents Insurance Policy.pdf"],
+    "Ayushman Mithra": [
+        "Guidelines for Ayushman Mitra.pdf",
+        "Guidelines  on Claim Settlement.pdf",
+        "Guidelines for Portability of Services.pdf",
+        "Guidelines for unspecified packages.pdf",
+        "Guidelines on Process of Beneficiary Identification - Revised.pdf",
+        "Guidelines on Process of Beneficiary Identification.pdf",
+        "Guidelines on Processes for Empanelment of Hospitals.pdf",
+        "Query rejection standardization.pdf",
+    ],
+    "Pradhan Mantri Suraksha Bima Yojana": ["Pradhan mantri suraksha bima yojana.pdf"],
+    "Saral Suraksha Bima Yojana": ["Saral Suraksha Bima Policy.pdf"],
+    "Rashtriya Swasthya Bima Yojana": ["Rashtriya Swasthya Bima Yojana.pdf"],
+}
+
+# Lower-case spellings seen in claims, matched on word boundaries.
+# Longer aliases are tried first ("sbi general" before "sbi").
+INSURER_ALIASES = {
+    "ICICI Lombard": ["icici lombard", "icici"],
+    "HDFC ERGO": ["hdfc ergo", "hdfc"],
+    "SBI General Insurance": ["sbi general", "sbi"],
+    "A Plus Health Insurance": ["a plus health"],
+    "Alliance Health Insurance": ["alliance health", "allaince health"],
+    "Reliance General Insurance": ["reliance"],
+    "Royal Sundaram": ["royal sundaram"],
+    "Universal Sompo": ["universal sompo"],
+    "Emedlife": ["emedlife"],
+    "Ayushman Mithra": ["ayushman mithra", "ayushman mitra", "ayushman bharat", "pm-jay", "pmjay"],
+    "Pradhan Mantri Suraksha Bima Yojana": [
+        "pradhan mantri suraksha bima", "pradhan mantri suraksha bhima", "pmsby"
+    ],
+    "Saral Suraksha Bima Yojana": ["saral suraksha"],
+    "Rashtriya Swasthya Bima Yojana": ["rashtriya swasthya bima", "rsby"],
+}
+
+INSURER_NAME_LINE = re.compile(r"^\s*Insurer Name:\s*(.+?)\s*$", re.IGNORECASE | re.MULTILINE)
+
+
+def _match_alias(text: str):
+    text = text.lower()
+    aliases = sorted(
+        ((alias, insurer) for insurer, names in INSURER_ALIASES.items() for alias in names),
+        key=lambda pair: -len(pair[0])
+    )
+    for alias, insurer in aliases:
+        if re.search(r"(?<!\w)" + re.escape(alias) + r"(?!\w)", text):
+            return insurer
+    return None
+
+
+def detect_insurer(text: str):
+    """
+    Insurer or scheme a claim refers to, or None. The "Insurer Name:" line
+    of the synthetic claim summaries wins over mentions elsewhere.
+    """
+    match = INSURER_NAME_LINE.search(text)
+    if match:
+        insurer = _match_alias(match.group(1))
+        if insurer is not None:
+            return insurer
+    return _match_alias(text)
+
+
+def insurer_source_files(insurer: str):
+    return INSURER_SOURCE_FILES.get(insurer, [])
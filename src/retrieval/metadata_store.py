@@ -0,0 +1,188 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+from array import array
+
+import numpy as np
+
+# File layout (little-endian):
+#   header   MAGIC + (rows, sources_offset, sources_length, text_offset, extras_offset)
+#   rows     rows x ROW_FIELDS int64: text start/length, source id, extras start/length,
+#            chunk_uid (-1 if the record has none)
+#   sources  JSON list of the distinct source file names (interned)
+#   text     UTF-8 chunk texts, back to back
+#   extras   compact JSON of every other field, one object per row
+MAGIC = b"PMSTORE2"
+HEADER = struct.Struct("<8s5Q")
+ROW_FIELDS = 6
+
+
+class MetadataStoreWriter:
+    """
+    Streams chunk records into a binary metadata store. Texts and extras
+    are spooled to temporary files; the store is assembled and atomically
+    moved into place on close, like JsonlWriter.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.count = 0
+
+        self._rows = array("q")
+        self._sources = {}
+        self._text = open(path + ".text.tmp", "wb")
+        self._extras = open(path + ".extras.tmp", "wb")
+
+    def _source_id(self, source_file):
+        if source_file not in self._sources:
+            self._sources[source_file] = len(self._sources)
+        return self._sources[source_file]
+
+    def write(self, record: dict):
+        extras = {k: v for k, v in record.items() if k not in ("text", "source_file")}
+        if "source_files" in extras:
+            extras["source_files"] = [self._source_id(s) for s in extras["source_files"]]
+
+        text = record["text"].encode("utf-8")
+        extras = json.dumps(extras, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+        self._rows.extend((
+            self._text.tell(), len(text),
+            self._source_id(record["source_file"]),
+            self._extras.tell(), len(extras),
+            record.get("chunk_uid", -1)
+        ))
+        self._text.write(text)
+        self._extras.write(extras)
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self, commit: bool = True):
+        self._text.close()
+        self._extras.close()
+
+        try:
+            if commit:
+                self._assemble()
+                os.replace(self.tmp_path, self.path)
+        finally:
+            for path in (self._text.name, self._extras.name):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _assemble(self):
+        sources = json.dumps(list(self._sources), ensure_ascii=False).encode("utf-8")
+        sources_offset = HEADER.size + len(self._rows) * self._rows.itemsize
+        text_offset = sources_offset + len(sources)
+        extras_offset = text_offset + os.path.getsize(self._text.name)
+
+        with open(self.tmp_path, "wb") as out:
+            out.write(HEADER.pack(MAGIC, self.count, sources_offset, len(sources), text_offset, extras_offset))
+            out.write(self._rows.tobytes())
+            out.write(sources)
+            for path in (self._text.name, self._extras.name):
+                with open(path, "rb") as f:
+                    shutil.copyfileobj(f, out)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+
+class MetadataStore:
+    """
+    Read-only, list-like view over a binary metadata store. The file is
+    memory-mapped; opening it only parses the header and the source
+    table, and store[i] decodes that one row.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._mmap = None
+        self._rows = None
+
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, count, sources_offset, sources_length, text_offset, extras_offset = HEADER.unpack_from(self._mmap)
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} is not a metadata store")
+
+        self._count = count
+        self._text_offset = text_offset
+        self._extras_offset = extras_offset
+        self._rows = memoryview(self._mmap)[HEADER.size:sources_offset].cast("q")
+        self.sources = json.loads(self._mmap[sources_offset:sources_offset + sources_length].decode("utf-8"))
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+
+        row = ROW_FIELDS * idx
+        text_start, text_length, source_id, extras_start, extras_length, _ = self._rows[row:row + ROW_FIELDS]
+
+        start = self._extras_offset + extras_start
+        record = {"source_file": self.sources[source_id]}
+        record.update(json.loads(self._mmap[start:start + extras_length].decode("utf-8")))
+        if "source_files" in record:
+            record["source_files"] = [self.sources[s] for s in record["source_files"]]
+
+        start = self._text_offset + text_start
+        record["text"] = self._mmap[start:start + text_length].decode("utf-8")
+        return record
+
+    def chunk_uids(self):
+        """chunk_uid of every row, in row order, without decoding any record."""
+        rows = np.frombuffer(self._rows, dtype=np.int64).reshape(-1, ROW_FIELDS)
+        return rows[:, ROW_FIELDS - 1].copy()
+
+    def rows_for_sources(self, source_files):
+        """
+        Rows whose chunk comes from any of source_files, including canonical
+        chunks that stand in for a near-duplicate in one of them.
+        """
+        wanted = {i for i, name in enumerate(self.sources) if name in set(source_files)}
+        if not wanted:
+            return np.array([], dtype=np.int64)
+
+        rows = np.frombuffer(self._rows, dtype=np.int64).reshape(-1, ROW_FIELDS)
+        matches = np.isin(rows[:, 2], list(wanted))
+
+        # Only rows that carry a source_files list need their extras decoded
+        for idx in np.flatnonzero(~matches):
+            start = self._extras_offset + rows[idx, 3]
+            extras = self._mmap[start:start + rows[idx, 4]]
+            if b'"source_files"' in extras and wanted & set(json.loads(extras)["source_files"]):
+                matches[idx] = True
+
+        del rows
+        return np.flatnonzero(matches)
+
+    def __iter__(self):
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def close(self):
+        if self._rows is not None:
+            self._rows.release()
+            self._rows = None
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __del__(self):
+        self.close()
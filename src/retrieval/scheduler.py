@@ -0,0 +1,136 @@
+import queue
+import threading
+import time
+from collections import Counter
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+
+DEFAULT_WINDOW_MS = 5.0
+DEFAULT_MAX_BATCH_SIZE = 64
+
+
+# -------------------------------------------------
+# Metrics
+# -------------------------------------------------
+@dataclass
+class SchedulerStats:
+    queries: int = 0
+    batches: int = 0
+    max_batch_size: int = 0
+    max_queue_depth: int = 0
+    wait_seconds: float = 0.0
+    batch_sizes: Counter = field(default_factory=Counter)
+
+    @property
+    def mean_batch_size(self) -> float:
+        return self.queries / self.batches if self.batches else 0.0
+
+    @property
+    def mean_wait_ms(self) -> float:
+        return self.wait_seconds * 1000 / self.queries if self.queries else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.queries} queries in {self.batches} batches "
+            f"(mean size {self.mean_batch_size:.1f}, max {self.max_batch_size}), "
+            f"max queue depth {self.max_queue_depth}, mean queueing delay {self.mean_wait_ms:.1f}ms"
+        )
+
+
+# -------------------------------------------------
+# Scheduler
+# -------------------------------------------------
+class MicroBatchScheduler:
+    """
+    Coalesces concurrent single-query calls into batched ones. submit()
+    queues a query and blocks until its result is ready; a worker thread
+    takes the first waiting query, keeps collecting for up to window_ms
+    (or until max_batch_size queries), and hands the batch to
+    batch_fn(queries) -> results (same order). If the batch fails, each
+    query is retried on its own, so an exception only reaches the caller
+    whose query raised it.
+    """
+
+    def __init__(self, batch_fn, window_ms: float = DEFAULT_WINDOW_MS,
+                 max_batch_size: int = DEFAULT_MAX_BATCH_SIZE):
+        self.batch_fn = batch_fn
+        self.window_seconds = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.stats = SchedulerStats()
+
+        self._queue = queue.Queue()
+        self._stats_lock = threading.Lock()
+        self._worker = threading.Thread(target=self._run, name="retrieval-batcher", daemon=True)
+        self._worker.start()
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def submit(self, query):
+        future = Future()
+        self._queue.put((query, future, time.perf_counter()))
+
+        depth = self._queue.qsize()
+        with self._stats_lock:
+            self.stats.max_queue_depth = max(self.stats.max_queue_depth, depth)
+
+        return future.result()
+
+    def _collect(self):
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.window_seconds
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _resolve(self, batch):
+        queries = [query for query, _, _ in batch]
+        try:
+            results = self.batch_fn(queries)
+            if len(results) != len(queries):
+                raise RuntimeError(f"batch_fn returned {len(results)} results for {len(queries)} queries")
+        except Exception:
+            if len(batch) == 1:
+                raise
+            # Isolate the failing query instead of failing every caller
+            for item in batch:
+                try:
+                    self._resolve([item])
+                except Exception as e:
+                    item[1].set_exception(e)
+            return
+
+        for (_, future, _), result in zip(batch, results):
+            future.set_result(result)
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            started = time.perf_counter()
+
+            with self._stats_lock:
+                self.stats.queries += len(batch)
+                self.stats.batches += 1
+                self.stats.max_batch_size = max(self.stats.max_batch_size, len(batch))
+                self.stats.batch_sizes[len(batch)] += 1
+                self.stats.wait_seconds += sum(started - queued_at for _, _, queued_at in batch)
+
+            # Whatever batch_fn raises, the worker keeps running and no
+            # caller is left blocked in submit()
+            error = None
+            try:
+                self._resolve(batch)
+            except BaseException as e:
+                error = e
+            finally:
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(error or RuntimeError("retrieval batch ended without a result"))
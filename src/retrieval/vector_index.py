@@ -0,0 +1,348 @@
+import json
+import os
+import re
+
+import numpy as np
+
+from src.retrieval.embedding_backends import EmbeddingBackendMismatch
+from src.retrieval.bm25 import BM25Index
+from src.retrieval.metadata_store import MetadataStore
+
+INDEX_INFO_FILE = "index_info.json"
+
+# Indexes built before index_info.json existed were all OpenAI text-embedding-3-small
+LEGACY_EMBEDDING = {"backend": "openai", "model": "text-embedding-3-small"}
+
+
+def write_index_info(index_dir: str, info: dict):
+    path = os.path.join(index_dir, INDEX_INFO_FILE)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(info, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_index_info(index_dir: str) -> dict:
+    path = os.path.join(index_dir, INDEX_INFO_FILE)
+    if not os.path.exists(path):
+        return {"embedding": LEGACY_EMBEDDING}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def check_embedding_backend(info: dict, backend):
+    """Refuses to query an index with a backend other than the one that built it."""
+    built_with = info.get("embedding", LEGACY_EMBEDDING)
+    if built_with != backend.identity():
+        raise EmbeddingBackendMismatch(
+            f"Index was built with embedding backend {built_with}, "
+            f"but the query backend is {backend.identity()}. "
+            f"Rebuild the index or set EMBEDDING_BACKEND to match."
+        )
+
+
+# -------------------------------------------------
+# Index types
+# -------------------------------------------------
+INDEX_TYPES = ("flat", "ivf_flat", "ivf_pq", "hnsw")
+
+# "ip" L2-normalizes vectors at build and query time and searches by inner
+# product (= cosine). "storage" scalar-quantizes the stored vectors:
+# fp16 halves and int8 quarters the float32 footprint (ivf_pq is already
+# compressed and ignores it).
+METRICS = ("l2", "ip")
+STORAGE_TYPES = ("float32", "fp16", "int8")
+
+DEFAULT_INDEX_PARAMS = {
+    "flat": {"metric": "l2", "storage": "float32"},
+    "ivf_flat": {"metric": "l2", "storage": "float32", "nlist": None, "nprobe": 16},
+    "ivf_pq": {"metric": "l2", "nlist": None, "m": 16, "nbits": 8, "nprobe": 16},
+    "hnsw": {"metric": "l2", "storage": "float32", "M": 32, "ef_construction": 80, "ef_search": 64},
+}
+
+
+def resolve_index_params(index_type: str, num_vectors: int, params: dict = None) -> dict:
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type {index_type!r}; expected one of {INDEX_TYPES}")
+
+    resolved = {**DEFAULT_INDEX_PARAMS[index_type], **(params or {})}
+
+    if resolved["metric"] not in METRICS:
+        raise ValueError(f"Unknown metric {resolved['metric']!r}; expected one of {METRICS}")
+    if resolved.get("storage", "float32") not in STORAGE_TYPES:
+        raise ValueError(f"Unknown storage {resolved['storage']!r}; expected one of {STORAGE_TYPES}")
+
+    # Rule of thumb: ~4 * sqrt(n) lists, but keep >= 39 training points per list
+    if "nlist" in resolved and resolved["nlist"] is None:
+        resolved["nlist"] = max(1, min(int(4 * num_vectors ** 0.5), num_vectors // 39))
+
+    return resolved
+
+
+def create_index(index_type: str, dim: int, params: dict):
+    import faiss
+
+    metric = faiss.METRIC_INNER_PRODUCT if params.get("metric") == "ip" else faiss.METRIC_L2
+    storage = params.get("storage", "float32")
+    qtype = {
+        "fp16": faiss.ScalarQuantizer.QT_fp16,
+        "int8": faiss.ScalarQuantizer.QT_8bit,
+    }.get(storage)
+
+    if index_type == "flat":
+        if qtype is not None:
+            return faiss.IndexScalarQuantizer(dim, qtype, metric)
+        return faiss.IndexFlat(dim, metric)
+
+    if index_type == "ivf_flat":
+        quantizer = faiss.IndexFlat(dim, metric)
+        if qtype is not None:
+            return faiss.IndexIVFScalarQuantizer(quantizer, dim, params["nlist"], qtype, metric)
+        return faiss.IndexIVFFlat(quantizer, dim, params["nlist"], metric)
+
+    if index_type == "ivf_pq":
+        quantizer = faiss.IndexFlat(dim, metric)
+        return faiss.IndexIVFPQ(quantizer, dim, params["nlist"], params["m"], params["nbits"], metric)
+
+    if index_type == "hnsw":
+        if qtype is not None:
+            index = faiss.IndexHNSWSQ(dim, qtype, params["M"], metric)
+        else:
+            index = faiss.IndexHNSWFlat(dim, params["M"], metric)
+        index.hnsw.efConstruction = params["ef_construction"]
+        return index
+
+    raise ValueError(f"Unknown index type {index_type!r}")
+
+
+def normalize_vectors(vectors):
+    """Row-wise L2 normalization into a new float32 array (faiss normalizes in place)."""
+    import faiss
+
+    vectors = np.array(vectors, dtype="float32", copy=True)
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def base_index(index):
+    """
+    The index inside an IndexIDMap/IndexIDMap2 wrapper (or the index
+    itself). The wrapper owns it: keep the wrapper alive while using it.
+    """
+    import faiss
+
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.downcast_index(index.index)
+    return index
+
+
+def apply_search_params(index, index_type: str, params: dict):
+    """Query-time knobs (not all of them survive write_index/read_index)."""
+    import faiss
+
+    if index_type in ("ivf_flat", "ivf_pq"):
+        faiss.extract_index_ivf(index).nprobe = params["nprobe"]
+    elif index_type == "hnsw":
+        base_index(index).hnsw.efSearch = params["ef_search"]
+
+
+def build_index(vectors, index_type: str = "flat", params: dict = None, ids=None):
+    """
+    Trains (if needed) and fills an index of the given type. With ids
+    (int64, e.g. chunk_uid) search returns those ids instead of insertion
+    positions: IVF indexes store them natively, the others are wrapped in
+    an IndexIDMap2 (whose remove_ids is only correct for flat storage).
+    Returns (index, resolved_params).
+    """
+    import faiss
+
+    params = resolve_index_params(index_type, len(vectors), params)
+    index = create_index(index_type, vectors.shape[1], params)
+
+    if params["metric"] == "ip":
+        vectors = normalize_vectors(vectors)
+
+    if not index.is_trained:
+        index.train(vectors)
+
+    if ids is None:
+        index.add(vectors)
+    else:
+        if index_type not in ("ivf_flat", "ivf_pq"):
+            index = faiss.IndexIDMap2(index)
+        index.add_with_ids(vectors, np.asarray(ids, dtype="int64"))
+
+    apply_search_params(index, index_type, params)
+    return index, params
+
+
+class VectorIndex:
+    """
+    A loaded FAISS index together with its index_info. search() has the
+    same signature as faiss' Index.search, so retrieval code works
+    unchanged for any index type. With metric "ip" the returned distances
+    are cosine similarities (higher is closer).
+
+    ID-mapped indexes return chunk_uids; given the chunk_uid of every
+    metadata row, search() translates them back to row positions.
+    """
+
+    def __init__(self, index, info: dict, row_uids=None):
+        self.index = index
+        self.info = info
+        self.index_type = info.get("index", {}).get("type", "flat")
+        self.params = info.get("index", {}).get("params", {})
+        self.metric = self.params.get("metric", "l2")
+        apply_search_params(self.index, self.index_type, self.params)
+
+        self._row_uids = None
+        self._sorted_uids = None
+        self._rows_by_uid = None
+        if row_uids is not None:
+            self._row_uids = np.asarray(row_uids, dtype="int64")
+            order = np.argsort(self._row_uids, kind="stable")
+            self._sorted_uids = self._row_uids[order]
+            self._rows_by_uid = order
+
+    @property
+    def d(self):
+        return self.index.d
+
+    @property
+    def ntotal(self):
+        return self.index.ntotal
+
+    def search(self, queries, k, rows=None):
+        """
+        With rows (metadata row positions), only those vectors are
+        considered; slots that can't be filled come back as -1.
+        """
+        if self.metric == "ip":
+            queries = normalize_vectors(queries)
+
+        if rows is None:
+            distances, labels = self.index.search(queries, k)
+        else:
+            # The selector works on the ids stored in the index
+            ids = np.ascontiguousarray(self._row_uids[rows] if self._row_uids is not None else rows, dtype="int64")
+            distances, labels = self.index.search(queries, k, params=self.search_parameters(ids))
+
+        if self._sorted_uids is None:
+            return distances, labels
+        return distances, self.rows_for_uids(labels)
+
+    def search_parameters(self, ids):
+        import faiss
+
+        selector = faiss.IDSelectorBatch(len(ids), faiss.swig_ptr(ids))
+        if self.index_type in ("ivf_flat", "ivf_pq"):
+            params = faiss.SearchParametersIVF(sel=selector, nprobe=self.params["nprobe"])
+        elif self.index_type == "hnsw":
+            params = faiss.SearchParametersHNSW(sel=selector, efSearch=self.params["ef_search"])
+        else:
+            params = faiss.SearchParameters(sel=selector)
+
+        # SWIG doesn't keep these alive for us
+        params.referenced_objects = [selector, ids]
+        return params
+
+    def rows_for_uids(self, uids):
+        """Maps chunk_uids to metadata rows; unknown uids and -1 padding become -1."""
+        uids = np.asarray(uids)
+        if len(self._sorted_uids) == 0:
+            return np.full(uids.shape, -1, dtype="int64")
+
+        positions = np.searchsorted(self._sorted_uids, uids).clip(0, len(self._sorted_uids) - 1)
+        found = (self._sorted_uids[positions] == uids) & (uids >= 0)
+        return np.where(found, self._rows_by_uid[positions], -1)
+
+
+def load_vector_index(index_dir: str, index_file: str, backend=None, info=None, row_uids=None) -> VectorIndex:
+    import faiss
+
+    if info is None:
+        info = read_index_info(index_dir)
+    if backend is not None:
+        check_embedding_backend(info, backend)
+
+    index = faiss.read_index(os.path.join(index_dir, index_file))
+    if not info.get("index", {}).get("id_map"):
+        row_uids = None
+    return VectorIndex(index, info, row_uids)
+
+
+def load_index_and_metadata(index_dir: str, index_file: str, meta_file: str, backend=None, info=None):
+    """
+    Opens the index generation committed in index_info.json together with
+    its metadata store. Returns (VectorIndex, MetadataStore).
+    """
+    if info is None:
+        info = read_index_info(index_dir)
+    index_file, meta_file = committed_files(info, index_file, meta_file)
+
+    # Memory-mapped: rows are decoded only when looked up
+    metadata = MetadataStore(os.path.join(index_dir, meta_file))
+    index = load_vector_index(index_dir, index_file, backend, info, metadata.chunk_uids())
+    return index, metadata
+
+
+def load_lexical_index(index_dir: str, info: dict = None):
+    """BM25 index of the committed generation, or None if it has none."""
+    if info is None:
+        info = read_index_info(index_dir)
+
+    lexical_file = info.get("files", {}).get("lexical")
+    if lexical_file is None:
+        return None
+    return BM25Index(os.path.join(index_dir, lexical_file))
+
+
+# -------------------------------------------------
+# Generations
+# -------------------------------------------------
+# Builds and updates never overwrite the files a reader may have open:
+# each one writes generation-suffixed files (policy_faiss.g<N>.index,
+# policy_metadata.g<N>.bin, ...) and then commits by atomically replacing
+# index_info.json, which names the current generation's files. A crash
+# before that leaves the previous generation in place, consistent.
+GENERATION_SUFFIX = re.compile(r"\.g(\d+)(\.[^.]*)?$")
+
+
+def generation_file(name: str, generation: int) -> str:
+    stem, ext = os.path.splitext(name)
+    return f"{stem}.g{generation}{ext}"
+
+
+def committed_files(info: dict, index_file: str, meta_file: str):
+    """(index, metadata) file names of the committed generation."""
+    files = info.get("files", {})
+    return files.get("index", index_file), files.get("metadata", meta_file)
+
+
+def next_generation(index_dir: str, names: dict):
+    """
+    Returns (generation, files) for the next commit, where files maps each
+    key of names (e.g. {"index": "policy_faiss.index"}) to its
+    generation-suffixed file name.
+    """
+    generation = read_index_info(index_dir).get("generation", 0) + 1
+    return generation, {key: generation_file(name, generation) for key, name in names.items()}
+
+
+def commit_generation(index_dir: str, info: dict, keep: int = 2):
+    """
+    Publishes a generation (info must carry "generation" and "files") and
+    removes files of older generations, keeping the last `keep` so that
+    readers that just read the previous index_info.json can still open it.
+    """
+    write_index_info(index_dir, info)
+
+    generation = info["generation"]
+    for name in info["files"].values():
+        stem = name[:GENERATION_SUFFIX.search(name).start()]
+        ext = os.path.splitext(name)[1]
+        pattern = re.compile(re.escape(stem) + r"\.g(\d+)" + re.escape(ext) + "$")
+        for filename in os.listdir(index_dir):
+            match = pattern.match(filename)
+            if match and int(match.group(1)) <= generation - keep:
+                os.remove(os.path.join(index_dir, filename))
@@ -0,0 +1,222 @@
+import asyncio
+import json
+import time
+import traceback
+from collections import Counter, defaultdict, deque
+from dataclasses import dataclass, field
+from http import HTTPStatus
+from urllib.parse import parse_qsl, urlsplit
+
+import numpy as np
+
+MAX_BODY_BYTES = 1024 * 1024
+HEADER_TIMEOUT_SECONDS = 30
+LATENCY_WINDOW = 10000
+
+# -------------------------------------------------
+# Minimal asyncio HTTP/1.1 server (JSON in, JSON or chunked stream out).
+# Only what the claims API and the local OpenAI stub need: Content-Length
+# request bodies, keep-alive, and streamed (chunked) responses. Kept on
+# the standard library so serving adds no dependencies.
+# -------------------------------------------------
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str = None, headers: dict = None):
+        super().__init__(message or HTTPStatus(status).phrase)
+        self.status = status
+        self.headers = headers or {}
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict
+    headers: dict
+    body: bytes
+    keep_alive: bool = True
+
+    def json(self):
+        try:
+            return json.loads(self.body or b"{}")
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f"Request body is not valid JSON: {e}")
+
+
+@dataclass
+class Response:
+    status: int = 200
+    body: object = b""  # bytes, or an async iterator of bytes (sent chunked)
+    content_type: str = "application/json"
+    headers: dict = field(default_factory=dict)
+
+
+def json_response(payload, status: int = 200, headers: dict = None) -> Response:
+    return Response(status, json.dumps(payload, ensure_ascii=False).encode("utf-8"), headers=headers or {})
+
+
+# -------------------------------------------------
+# Metrics
+# -------------------------------------------------
+class LatencyTracker:
+    """
+    Per-route latency of served requests over the last `window` of them,
+    plus status counts. 429 rejections return in microseconds and would
+    swamp the percentiles under load, so they are only counted.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        self._latencies = defaultdict(lambda: deque(maxlen=window))
+        self._statuses = defaultdict(Counter)
+
+    def record(self, route: str, seconds: float, status: int):
+        if status != HTTPStatus.TOO_MANY_REQUESTS:
+            self._latencies[route].append(seconds)
+        self._statuses[route][status] += 1
+
+    def summary(self) -> dict:
+        summary = {}
+        for route, statuses in sorted(self._statuses.items()):
+            values = np.array(self._latencies[route]) * 1000
+            summary[route] = {
+                "requests": int(sum(statuses.values())),
+                "rejected": statuses[HTTPStatus.TOO_MANY_REQUESTS],
+                "p50_ms": round(float(np.percentile(values, 50)), 2) if values.size else None,
+                "p99_ms": round(float(np.percentile(values, 99)), 2) if values.size else None,
+                "statuses": {str(k): v for k, v in sorted(statuses.items())}
+            }
+        return summary
+
+
+# -------------------------------------------------
+# Server
+# -------------------------------------------------
+class HTTPServer:
+    """
+    routes maps (method, path) to `async def handler(request) -> Response`.
+    Handlers raise HTTPError for client errors; anything else becomes a
+    500 with a JSON error body. Latency of every routed request is
+    recorded in self.latency.
+    """
+
+    def __init__(self, routes: dict):
+        self.routes = routes
+        self.latency = LatencyTracker()
+        self._server = None
+
+    async def start(self, host: str, port: int):
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        return self._server
+
+    @property
+    def port(self) -> int:
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        async with self._server:
+            await self._server.serve_forever()
+
+    def close(self):
+        if self._server is not None:
+            self._server.close()
+
+    # -------------------------------------------------
+    async def _read_request(self, reader):
+        line = await asyncio.wait_for(reader.readline(), HEADER_TIMEOUT_SECONDS)
+        if not line:
+            return None
+
+        try:
+            method, target, version = line.decode("latin-1").split()
+        except ValueError:
+            raise HTTPError(400, "Malformed request line")
+
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), HEADER_TIMEOUT_SECONDS)
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        length = int(headers.get("content-length") or 0)
+        if length > MAX_BODY_BYTES:
+            raise HTTPError(413)
+        body = await reader.readexactly(length) if length else b""
+
+        url = urlsplit(target)
+        keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+        return Request(method.upper(), url.path, dict(parse_qsl(url.query)), headers, body, keep_alive)
+
+    async def _dispatch(self, request) -> Response:
+        handler = self.routes.get((request.method, request.path))
+        if handler is None:
+            if any(path == request.path for _, path in self.routes):
+                raise HTTPError(405)
+            raise HTTPError(404)
+        return await handler(request)
+
+    async def _write_response(self, writer, response: Response, keep_alive: bool):
+        status = HTTPStatus(response.status)
+        headers = {
+            "Content-Type": response.content_type,
+            "Connection": "keep-alive" if keep_alive else "close",
+            **response.headers
+        }
+        streamed = not isinstance(response.body, (bytes, bytearray))
+        if streamed:
+            headers["Transfer-Encoding"] = "chunked"
+        else:
+            headers["Content-Length"] = str(len(response.body))
+
+        head = f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+        head += "".join(f"{k}: {v}\r\n" for k, v in headers.items()) + "\r\n"
+        writer.write(head.encode("latin-1"))
+
+        if not streamed:
+            writer.write(response.body)
+        else:
+            async for piece in response.body:
+                if piece:
+                    writer.write(f"{len(piece):x}\r\n".encode("latin-1") + piece + b"\r\n")
+                    await writer.drain()
+            writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    async def _handle_connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self._read_request(reader)
+                except (HTTPError, ValueError) as e:
+                    status = e.status if isinstance(e, HTTPError) else 400
+                    await self._write_response(writer, json_response({"error": str(e)}, status), False)
+                    break
+                if request is None:
+                    break
+
+                start = time.perf_counter()
+                try:
+                    response = await self._dispatch(request)
+                except HTTPError as e:
+                    response = json_response({"error": str(e)}, e.status, e.headers)
+                except Exception as e:
+                    traceback.print_exc()
+                    response = json_response({"error": f"{type(e).__name__}: {e}"}, 500)
+
+                await self._write_response(writer, response, request.keep_alive)
+                if (request.method, request.path) in self.routes:
+                    self.latency.record(
+                        f"{request.method} {request.path}", time.perf_counter() - start, response.status
+                    )
+                if not request.keep_alive:
+                    break
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except asyncio.CancelledError:
+            # Idle keep-alive connections are cancelled on shutdown; this
+            # task is the top of the connection, so there is no one to tell
+            pass
+        finally:
+            writer.close()
@@ -1 +1,91 @@
+import json
+import os
+from array import array
 
+
+def iter_jsonl(path: str):
+    """Yields one record per line of a newline-delimited JSON file."""
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+class JsonlWriter:
+    """
+    Streams records to a JSONL file. Writes go to a temporary file that
+    replaces the target only when the writer is closed without an error,
+    so readers never see a half-written file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.tmp_path = path + ".tmp"
+        self.count = 0
+        self._file = open(self.tmp_path, "w", encoding="utf-8")
+
+    def write(self, record: dict):
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+        self.count += 1
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def close(self, commit: bool = True):
+        self._file.close()
+        if commit:
+            os.replace(self.tmp_path, self.path)
+        else:
+            os.remove(self.tmp_path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+
+class JsonlRecords:
+    """
+    Read-only, list-like view over a JSONL file. A single scan records
+    the byte offset of every line, and records[i] reads and parses just
+    that line (os.pread, so concurrent readers don't share a file
+    position).
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._fd = None
+        self._offsets = array("q", [0])
+
+        with open(path, "rb") as f:
+            for line in f:
+                self._offsets.append(self._offsets[-1] + len(line))
+
+        self._fd = os.open(path, os.O_RDONLY)
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __getitem__(self, idx):
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(idx)
+
+        start = self._offsets[idx]
+        length = self._offsets[idx + 1] - start
+        return json.loads(os.pread(self._fd, length, start).decode("utf-8"))
+
+    def __iter__(self):
+        return iter_jsonl(self.path)
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+    def __del__(self):
+        self.close()
@@ -0,0 +1,27 @@
+from functools import lru_cache
+
+import tiktoken
+
+# Embedding inputs (text-embedding-3-*) are budgeted with cl100k_base.
+# Chat models use their own encoding (gpt-4o-mini: o200k_base), see
+# get_model_encoding().
+TOKEN_ENCODING = "cl100k_base"
+
+
+@lru_cache(maxsize=None)
+def get_encoding(name: str = TOKEN_ENCODING):
+    return tiktoken.get_encoding(name)
+
+
+@lru_cache(maxsize=None)
+def get_model_encoding(model: str):
+    """Encoding the given model tokenizes with; TOKEN_ENCODING if tiktoken doesn't know it."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return get_encoding()
+
+
+def count_tokens(text: str, encoding=None) -> int:
+    encoding = encoding or get_encoding()
+    return len(encoding.encode(text, disallowed_special=()))
@@ -7,36 +7,6 @@ from datetime import datetime
 from pathlib import Path
 import re
 
-REQUIRED_FIELDS = [
-    "coverage_decision",
-    "conditions_or_exclusions",
-    "evidence_sources",
-    "confidence"
-]
-
-
-def classify_json_error(raw_output: str):
-    if raw_output is None:
-        return "ERR-UNKNOWN"
-
-    # Truncated JSON detection
-    if raw_output.count("{") != raw_output.count("}"):
-        return "ERR-JSON-02"
-
-    # Markdown wrapper detection
-    if "```" in raw_output:
-        return "ERR-JSON-01"
-
-    return "ERR-JSON-01"
-
-
-def validate_schema(parsed_json: dict):
-    for field in REQUIRED_FIELDS:
-        if field not in parsed_json:
-            return False
-    return True
-
-
 # -------------------------------------------------
 # Project path setup
 # -------------------------------------------------
@@ -47,7 +17,9 @@ sys.path.append(str(PROJECT_ROOT))
 # IMPORT EXISTING REASONING FUNCTION
 # -------------------------------------------------
 # This directly reuses your pipeline
-from scripts.claim_reasoning import run_reasoning
+from scripts.claim_reasoning import run_reasoning, get_reasoner, get_response_cache
+from src.reasoning.async_engine import process_claims
+from src.reasoning.canonical_claims import group_claims
 # 
 # -------------------------------------------------
 # CONFIGURATION
@@ -59,6 +31,13 @@ MAX_CLAIMS = 500
 TARGET_START = 400   # e.g., 400 for claims 401–500
 TARGET_END = 500     # exclusive
 
+# Claims kept in flight at once by the async engine (1 = serial)
+CONCURRENCY = 8
+
+# Reason once per distinct claim (ignoring Claim ID) and copy the result
+# to every duplicate
+CANONICALIZE_CLAIMS = True
+
 
 INPUT_CLAIMS_DIR = Path("data/processed/synthetic_claims")
 
@@ -138,58 +117,71 @@ def run_v1_1_batches():
             for start in range(0, total_to_run, BATCH_SIZE)
         ]
 
+    # Warm session shared by every batch: index + metadata loaded once
+    reasoner = get_reasoner()
+
     for start_idx, end_idx in ranges:
         batch_files = claim_files[start_idx:end_idx]
 
         print(f"\nRunning batch: claims {start_idx + 1} to {end_idx}")
 
-        results = []
-
+        claim_texts = []
         for file_path in batch_files:
             with open(file_path, "r", encoding="utf-8") as f:
-                claim_text = f.read().strip()
-
-            claim_id = file_path.stem
-            metadata = extract_metadata_from_text(claim_text)
-
-            error_type = None
-            raw_response = None
-            parsed = None
-
-            try:
-                raw_response = run_reasoning(claim_text)
-
-                try:
-                    parsed = json.loads(raw_response)
-
-                    if not validate_schema(parsed):
-                        error_type = "ERR-SCHEMA-01"
-
-                except json.JSONDecodeError:
-                    error_type = classify_json_error(raw_response)
-
-            except Exception as e:
-                error_type = "ERR-RUNTIME-01"
-                raw_response = str(e)
-
-            if error_type:
-                results.append({
-                    "claim_id": claim_id,
-                    "insurer": metadata.get("insurer"),
-                    "coverage_decision": "ERROR",
-                    "confidence": None,
-                    "error_type": error_type,
-                    "raw_llm_output": raw_response
-                })
-            else:
-                results.append({
-                    "claim_id": claim_id,
-                    "insurer": metadata.get("insurer"),
-                    "coverage_decision": parsed.get("coverage_decision"),
-                    "confidence": parsed.get("confidence"),
-                    "error_type": None,
-                    "raw_llm_output": None
-                })
+                claim_texts.append(f.read().strip())
+
+        # Claims that differ only in Claim ID share one retrieval and one
+        # LLM call; results are fanned back out below
+        grouping = group_claims(claim_texts) if CANONICALIZE_CLAIMS else None
+        if grouping is not None:
+            reason_texts = [group.text for group in grouping.groups]
+            print(f"Canonicalization: {grouping.summary()}")
+        else:
+            reason_texts = claim_texts
+
+        # Bulk retrieval for the whole batch; on failure each claim falls
+        # back to its own retrieval so errors stay per-claim
+        try:
+            clauses_per_claim = reasoner.retrieve_many(reason_texts)
+        except Exception as e:
+            print(f"Bulk retrieval failed, retrieving per claim: {e}")
+            clauses_per_claim = [None] * len(reason_texts)
+
+        claims = [
+            {
+                "claim_id": f"group_{i:04d}",
+                "claim_text": claim_text,
+                "clauses": clauses
+            }
+            for i, (claim_text, clauses) in enumerate(zip(reason_texts, clauses_per_claim))
+        ]
+
+        # Async engine keeps CONCURRENCY claims in flight; per-claim error
+        # classification and output order are preserved
+        results, report = process_claims(
+            claims,
+            lambda text, clauses: run_reasoning(text, reasoner, clauses),
+            concurrency=CONCURRENCY
+        )
+        print(f"Throughput: {report.summary()}")
+
+        if grouping is not None:
+            results = grouping.fan_out(results)
+        results = [
+            {
+                **result,
+                "claim_id": file_path.stem,
+                "insurer": extract_metadata_from_text(claim_text).get("insurer")
+            }
+            for file_path, claim_text, result in zip(batch_files, claim_texts, results)
+        ]
+        if reasoner.scheduler is not None:
+            print(f"Retrieval batching: {reasoner.scheduler.stats.summary()}")
+        print(f"Prompt context: {reasoner.context_stats.summary()}")
+        if reasoner.streaming:
+            print(f"Streaming: {reasoner.stream_stats.summary()}")
+        if reasoner.response_cache is not None:
+            print(f"LLM cache: {reasoner.response_cache.summary()}")
 
         output_file = OUTPUT_DIR / f"batch_eval_results_v1_2_{start_idx + 1}_to_{end_idx}.csv"
         write_results_csv(results, output_file)
@@ -221,5 +213,10 @@ def write_results_csv(results, output_path: Path):
 if __name__ == "__main__":
     print("Starting V1.1 batch evaluation (limited to 500 claims)...")
     run_v1_1_batches()
+
+    cache = get_response_cache()
+    if cache is not None:
+        evicted = cache.evict()
+        print(f"LLM cache evicted {evicted} entries; {cache.summary()}")
     print("\nV1.1 batch evaluation complete.")
 
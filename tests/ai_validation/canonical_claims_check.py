@@ -0,0 +1,57 @@
+import sys
+from pathlib import Path
+
+# -------------------------------------------------
+# Project path setup
+# -------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.reasoning.canonical_claims import group_claims, parse_claim
+
+# -------------------------------------------------
+# Checks for claim canonicalization: only the Claim ID may be ignored,
+# every other line has to keep claims apart and reach the prompt.
+# -------------------------------------------------
+GENERATED_CLAIM = """
+Health Insurance Claim Summary
+
+Claim ID: {claim_id}
+
+Insurer Name: HDFC ERGO
+
+Diagnosis:
+Knee Osteoarthritis
+
+Proposed Procedure:
+Knee Replacement Surgery
+""".strip()
+
+
+def check_claim_id_ignored():
+    grouping = group_claims([GENERATED_CLAIM.format(claim_id="1a2b3c4d"), GENERATED_CLAIM.format(claim_id="9f8e7d6c")])
+    assert len(grouping.groups) == 1, grouping.summary()
+    assert "Claim ID" not in grouping.groups[0].text
+    assert "Knee Replacement Surgery" in grouping.groups[0].text
+
+
+def check_free_text_after_claim_id_kept():
+    knee = "Claim ID: 1001\nPatient underwent knee replacement surgery.\nInsurer Name: HDFC ERGO"
+    cosmetic = "Claim ID: 1001\nPatient underwent cosmetic hair transplant.\nInsurer Name: HDFC ERGO"
+
+    grouping = group_claims([knee, cosmetic])
+    assert len(grouping.groups) == 2, grouping.summary()
+
+    _, canonical_text = parse_claim(knee)
+    assert canonical_text == "Patient underwent knee replacement surgery.\nInsurer Name: HDFC ERGO", canonical_text
+
+
+def check_bare_claim_id_takes_one_line():
+    _, canonical_text = parse_claim("Claim ID:\n1001\nPatient underwent knee replacement surgery.")
+    assert canonical_text == "Patient underwent knee replacement surgery.", canonical_text
+
+
+if __name__ == "__main__":
+    for check in (check_claim_id_ignored, check_free_text_after_claim_id_kept, check_bare_claim_id_takes_one_line):
+        check()
+        print(f"ok  {check.__name__}")
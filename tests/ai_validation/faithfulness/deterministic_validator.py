@@ -1,5 +1,15 @@
+import sys
+from pathlib import Path
 from typing import List, Dict
 
+# -------------------------------------------------
+# Project path setup
+# -------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[3]
+sys.path.append(str(PROJECT_ROOT))
+
+from src.retrieval.citations import cited_pages, format_citation, chunk_sources
+
 
 # -------------------------------------------------
 # Helper: Normalize text
@@ -20,7 +30,25 @@ def concatenate_clause_text(retrieved_clauses: List[Dict]) -> str:
 # Extract all retrieved source file names
 # -------------------------------------------------
 def extract_retrieved_sources(retrieved_clauses: List[Dict]) -> List[str]:
-    return [c.get("source_file") for c in retrieved_clauses]
+    # Deduplicated clauses count as evidence for every file they appear in
+    return [source for c in retrieved_clauses for source in chunk_sources(c)]
+
+
+# -------------------------------------------------
+# Page-level citations of the retrieved clauses
+# -------------------------------------------------
+def extract_retrieved_citations(retrieved_clauses: List[Dict]) -> List[str]:
+    return [format_citation(c) for c in retrieved_clauses]
+
+
+def retrieved_pages_by_source(retrieved_clauses: List[Dict]) -> Dict[str, set]:
+    pages = {}
+    for c in retrieved_clauses:
+        if c.get("page_start") is None:
+            continue
+        page_end = c.get("page_end") or c["page_start"]
+        pages.setdefault(c.get("source_file"), set()).update(range(c["page_start"], page_end + 1))
+    return pages
 
 
 # -------------------------------------------------
@@ -29,11 +57,23 @@ def extract_retrieved_sources(retrieved_clauses: List[Dict]) -> List[str]:
 def check_fabricated_evidence(parsed_output: Dict, retrieved_clauses: List[Dict]) -> bool:
     evidence_sources = parsed_output.get("evidence_sources", [])
     retrieved_sources = extract_retrieved_sources(retrieved_clauses)
+    retrieved_pages = retrieved_pages_by_source(retrieved_clauses)
 
     for source in evidence_sources:
-        if source not in retrieved_sources:
+        if source in retrieved_sources:
+            continue
+
+        # Citation with a page reference, e.g. "ICICI Lombard.pdf, p. 4":
+        # the file must be retrieved and every cited page must be covered
+        matched_file = next((r for r in retrieved_sources if r and source.startswith(r)), None)
+        if matched_file is None:
             return True  # Fabricated evidence detected
 
+        pages = cited_pages(source[len(matched_file):])
+        known_pages = retrieved_pages.get(matched_file)
+        if pages and known_pages is not None and not pages <= known_pages:
+            return True  # Cites a page that was not retrieved
+
     return False
 
 
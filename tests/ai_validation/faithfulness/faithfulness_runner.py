@@ -5,9 +5,9 @@ from datetime import datetime
 # -------------------------------------------------
 # Imports from faithfulness layer
 # -------------------------------------------------
-from reasoning_with_context import run_reasoning_with_context
-from deterministic_validator import deterministic_faithfulness_check
-from llm_judge import run_llm_judge
+from reasoning_with_context import run_reasoning_with_context, get_reasoner
+from deterministic_validator import deterministic_faithfulness_check, extract_retrieved_citations
+from llm_judge import run_llm_judge, get_response_cache
 
 
 # -------------------------------------------------
@@ -48,12 +48,20 @@ def run_faithfulness_evaluation():
     claim_files = load_claim_files(BATCH_SIZE)
     results = []
 
+    # One warm session for the whole run (index + metadata loaded once)
+    reasoner = get_reasoner()
+
     print(f"\nRunning V1.4 faithfulness evaluation on {len(claim_files)} claims...\n")
 
+    claim_texts = []
     for file_path in claim_files:
-
         with open(file_path, "r", encoding="utf-8") as f:
-            claim_text = f.read().strip()
+            claim_texts.append(f.read().strip())
+
+    # Bulk retrieval: batched embeddings + one matrix search for all claims
+    clauses_per_claim = reasoner.retrieve_many(claim_texts)
+
+    for file_path, claim_text, clauses in zip(claim_files, claim_texts, clauses_per_claim):
 
         claim_id = file_path.stem
         insurer = extract_insurer_from_text(claim_text)
@@ -61,10 +69,11 @@ def run_faithfulness_evaluation():
         # -----------------------------
         # Step 1: Run RAG with context
         # -----------------------------
-        rag_output = run_reasoning_with_context(claim_text)
+        rag_output = run_reasoning_with_context(claim_text, reasoner, clauses)
 
         parsed_output = rag_output["parsed_output"]
-        retrieved_clauses = rag_output["retrieved_clauses"]
+        # Faithfulness is judged against the clauses the model was shown
+        retrieved_clauses = rag_output["context_clauses"]
 
         if not parsed_output:
             coverage_decision = None
@@ -93,6 +102,7 @@ def run_faithfulness_evaluation():
             )
             
             retrieved_sources = [c.get("source_file") for c in retrieved_clauses]
+            retrieved_citations = extract_retrieved_citations(retrieved_clauses)
             retrieved_text_snippet = " ".join(
             [c.get("text", "") for c in retrieved_clauses]
            )[:300]  # limit to 300 chars
@@ -104,6 +114,7 @@ def run_faithfulness_evaluation():
             "deterministic_status": deterministic_status,
             "judge_status": judge_status,
             "retrieved_sources": ", ".join(retrieved_sources),
+            "retrieved_citations": "; ".join(retrieved_citations),
             "retrieved_snippet": retrieved_text_snippet
         })
 
@@ -125,6 +136,7 @@ def run_faithfulness_evaluation():
                 "deterministic_status",
                 "judge_status",
                 "retrieved_sources",
+                "retrieved_citations",
                 "retrieved_snippet"
             ]
         )
@@ -164,6 +176,11 @@ def print_summary_metrics(results):
     print(f"PARTIALLY_SUPPORTED: {judge_partial} ({judge_partial/total:.2%})")
     print(f"NOT_SUPPORTED: {judge_not_supported} ({judge_not_supported/total:.2%})")
 
+    # Reasoning and judge calls share one cache
+    cache = get_response_cache()
+    if cache is not None:
+        print(f"\nLLM cache: {cache.summary()}")
+
 
 # -------------------------------------------------
 # Entry Point
@@ -171,3 +188,4 @@ def print_summary_metrics(results):
 if __name__ == "__main__":
     results = run_faithfulness_evaluation()
     print_summary_metrics(results)
+    print(f"Prompt context: {get_reasoner().context_stats.summary()}")
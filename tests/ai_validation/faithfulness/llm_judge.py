@@ -9,7 +9,9 @@ import openai
 PROJECT_ROOT = Path(__file__).resolve().parents[3]
 sys.path.append(str(PROJECT_ROOT))
 
-from scripts.claim_reasoning import LLM_MODEL
+from scripts.claim_reasoning import LLM_MODEL, LLM_CACHE_BYPASS, get_response_cache
+from src.reasoning.response_cache import cached_chat_completion
+from src.retrieval.citations import format_citation
 
 
 # -------------------------------------------------
@@ -19,7 +21,7 @@ def build_judge_prompt(claim_text: str, retrieved_clauses: list, parsed_output:
 
     clause_block = ""
     for i, clause in enumerate(retrieved_clauses, start=1):
-        clause_block += f"\nClause {i} (Source: {clause.get('source_file')}):\n{clause.get('text')}\n"
+        clause_block += f"\nClause {i} (Source: {format_citation(clause)}):\n{clause.get('text')}\n"
 
     decision = parsed_output.get("coverage_decision", "")
     confidence = parsed_output.get("confidence", "")
@@ -65,15 +67,18 @@ def run_llm_judge(claim_text: str, retrieved_clauses: list, parsed_output: dict)
 
     prompt = build_judge_prompt(claim_text, retrieved_clauses, parsed_output)
 
-    response = openai.chat.completions.create(
+    # Same on-disk cache as the reasoning call: unchanged claims/clauses
+    # don't get re-judged on a regression re-run
+    raw_output = cached_chat_completion(
+        openai,
+        get_response_cache(),
+        bypass=LLM_CACHE_BYPASS,
         model=LLM_MODEL,
         messages=[{"role": "user", "content": prompt}],
         temperature=0.0,  # Deterministic evaluation
         response_format={"type": "json_object"}
     )
 
-    raw_output = response.choices[0].message.content
-
     try:
         parsed = json.loads(raw_output)
         return parsed.get("judge_verdict", "NOT_SUPPORTED")
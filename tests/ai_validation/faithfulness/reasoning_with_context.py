@@ -1,7 +1,6 @@
 import json
 import sys
 from pathlib import Path
-import openai
 
 # -------------------------------------------------
 # Project path setup
@@ -12,48 +11,39 @@ sys.path.append(str(PROJECT_ROOT))
 # -------------------------------------------------
 # Import existing pipeline components
 # -------------------------------------------------
-from scripts.claim_reasoning import (
-    load_index_and_metadata,
-    retrieve_clauses,
-    build_prompt,
-    LLM_MODEL
-)
+from scripts.claim_reasoning import get_reasoner
 
 # -------------------------------------------------
 # Run reasoning with retrieval context
 # -------------------------------------------------
-def run_reasoning_with_context(query: str):
+def run_reasoning_with_context(query: str, reasoner=None, clauses=None):
     """
     Executes full RAG pipeline and returns:
     - Parsed decision output
     - Retrieved clauses
-    """
-
-    index, metadata = load_index_and_metadata()
 
-    # Step 1: Retrieve clauses
-    retrieved_clauses = retrieve_clauses(query, index, metadata)
+    Uses the shared warm ClaimReasoner, so the index and metadata are
+    loaded once per process rather than once per claim. Pass clauses
+    (e.g. from reasoner.retrieve_many) to skip per-claim retrieval.
+    """
 
-    # Step 2: Build prompt
-    prompt = build_prompt(query, retrieved_clauses)
+    reasoner = reasoner or get_reasoner()
 
-    # Step 3: Call LLM (structured output mode)
-    response = openai.chat.completions.create(
-        model=LLM_MODEL,
-        messages=[{"role": "user", "content": prompt}],
-        temperature=0.2,
-        response_format={"type": "json_object"}
-    )
+    # Steps 1-3: Retrieve clauses, build prompt, call LLM (structured output mode)
+    rag_output = reasoner.reason_with_context(query, clauses)
 
-    raw_output = response.choices[0].message.content
+    raw_output = rag_output["raw_output"]
+    retrieved_clauses = rag_output["retrieved_clauses"]
 
     try:
-        parsed_output = json.loads(raw_output)
+        parsed_output = json.loads(raw_output) if raw_output is not None else None
     except json.JSONDecodeError:
         parsed_output = None
 
     return {
         "parsed_output": parsed_output,
         "raw_output": raw_output,
-        "retrieved_clauses": retrieved_clauses
+        "retrieved_clauses": retrieved_clauses,
+        # What the prompt actually contained (merged / cut to the token budget)
+        "context_clauses": rag_output["context_clauses"]
     }
@@ -0,0 +1,119 @@
+import sys
+import json
+import time
+import asyncio
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+
+# -------------------------------------------------
+# Project path setup
+# -------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+# -------------------------------------------------
+# CONFIGURATION
+# -------------------------------------------------
+# Fires NUM_REQUESTS claims at a running claims API (scripts/serve_claims_api.py)
+# with CONCURRENCY requests in flight, then reports status counts and
+# client-side p50/p99 latency next to the service's own /health numbers.
+# See tests/ai_validation/stub_openai_server.py for a fully offline setup.
+HOST = "127.0.0.1"
+PORT = 8080
+
+ENDPOINT = "/assess"      # or "/retrieve"
+NUM_REQUESTS = 200
+CONCURRENCY = 64
+
+INPUT_CLAIMS_DIR = Path("data/processed/synthetic_claims")
+
+FALLBACK_CLAIMS = [
+    "Is cataract surgery covered in the first year of the policy?",
+    "Insurer: ICICI Lombard\nDiagnosis: Knee Osteoarthritis\nProposed Procedure: Knee Replacement Surgery",
+    "Insurer: HDFC ERGO\nDiagnosis: Hernia\nProposed Procedure: Hernia Repair Surgery",
+    "Is cosmetic hair transplant surgery covered?",
+]
+
+
+def load_claim_texts(limit: int):
+    files = sorted(INPUT_CLAIMS_DIR.glob("synthetic_claim_*.txt"))[:limit]
+    texts = [f.read_text(encoding="utf-8").strip() for f in files]
+    return texts or FALLBACK_CLAIMS
+
+
+# -------------------------------------------------
+# Minimal HTTP client (one connection per request)
+# -------------------------------------------------
+async def http_request(method: str, path: str, payload=None, host=HOST, port=PORT):
+    body = json.dumps(payload).encode("utf-8") if payload is not None else b""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode("latin-1") + body
+        )
+        await writer.drain()
+
+        status = int((await reader.readline()).split()[1])
+        length = None
+        while True:
+            line = await reader.readline()
+            if line in (b"\r\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            if name.strip().lower() == "content-length":
+                length = int(value)
+        data = await (reader.readexactly(length) if length is not None else reader.read())
+        return status, json.loads(data or b"null")
+    finally:
+        writer.close()
+
+
+# -------------------------------------------------
+# Load run
+# -------------------------------------------------
+async def run_load(texts, endpoint=ENDPOINT, num_requests=NUM_REQUESTS, concurrency=CONCURRENCY,
+                   host=HOST, port=PORT):
+    field = "claim_text" if endpoint == "/assess" else "query"
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = {}
+    statuses = Counter()
+    decisions = Counter()
+
+    async def one(i):
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                status, body = await http_request(
+                    "POST", endpoint, {field: texts[i % len(texts)], "claim_id": f"load_{i:05d}"}, host, port
+                )
+            except (ConnectionError, asyncio.IncompleteReadError) as e:
+                status, body = type(e).__name__, None
+            latencies.setdefault(status, []).append(time.perf_counter() - start)
+            statuses[status] += 1
+            if status == 200 and endpoint == "/assess":
+                decisions[body.get("error_type") or body.get("coverage_decision")] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(num_requests)))
+    elapsed = time.perf_counter() - start
+
+    print(f"{num_requests} x POST {endpoint} at concurrency {concurrency}: "
+          f"{elapsed:.2f}s ({num_requests / elapsed:.1f} req/s)")
+    for status, values in sorted(latencies.items(), key=lambda item: str(item[0])):
+        values = np.array(values) * 1000
+        print(f"  {status}: {len(values):5d}  p50 {np.percentile(values, 50):8.1f}ms  "
+              f"p99 {np.percentile(values, 99):8.1f}ms")
+    if decisions:
+        print("  outcomes: " + ", ".join(f"{k}={v}" for k, v in decisions.most_common()))
+
+    _, health = await http_request("GET", "/health", host=host, port=port)
+    print("Service-side latency: " + json.dumps(health.get("latency", {}), indent=2))
+    return statuses, latencies
+
+
+if __name__ == "__main__":
+    asyncio.run(run_load(load_claim_texts(NUM_REQUESTS)))
@@ -0,0 +1,205 @@
+import sys
+import json
+import time
+import asyncio
+import hashlib
+from pathlib import Path
+from types import SimpleNamespace
+
+import numpy as np
+
+# -------------------------------------------------
+# Project path setup
+# -------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+
+from scripts.claim_reasoning import build_prompt
+from src.reasoning.async_engine import process_claims
+
+# -------------------------------------------------
+# Local stand-in for the OpenAI client
+# -------------------------------------------------
+# Mirrors the subset of the client surface used by the pipeline
+# (embeddings.create, chat.completions.create) with a fixed per-call
+# latency, so concurrency and error handling can be exercised offline.
+
+STUB_EMBEDDING_DIM = 64
+
+VALID_OUTPUT = json.dumps({
+    "coverage_decision": "Covered with conditions",
+    "conditions_or_exclusions": ["Waiting period applies"],
+    "evidence_sources": ["ICICI Lombard.pdf"],
+    "confidence": "Medium"
+})
+
+# Scripted failure outputs, keyed by a marker that can appear in the prompt
+SCRIPTED_OUTPUTS = {
+    "[stub:markdown]": "```json\n" + VALID_OUTPUT + "\n```",
+    "[stub:truncated]": VALID_OUTPUT[:40],
+    "[stub:schema]": json.dumps({"coverage_decision": "Covered"}),
+}
+
+# Prompts with this marker get the markdown output on their first call
+# only, so retries can be exercised
+FLAKY_MARKER = "[stub:flaky]"
+
+# Characters per streamed chunk (roughly one token)
+STREAM_CHUNK_CHARS = 4
+
+
+def stub_chat_output(prompt: str, seen_flaky: set):
+    """(content, finish_reason) the stub answers prompt with; [stub:error] raises."""
+    if "[stub:error]" in prompt:
+        raise RuntimeError("stub: simulated API failure")
+
+    content = VALID_OUTPUT
+    for marker, output in SCRIPTED_OUTPUTS.items():
+        if marker in prompt:
+            content = output
+            break
+    if FLAKY_MARKER in prompt and prompt not in seen_flaky:
+        seen_flaky.add(prompt)
+        content = SCRIPTED_OUTPUTS["[stub:markdown]"]
+
+    finish_reason = "length" if "[stub:truncated]" in prompt else "stop"
+    return content, finish_reason
+
+
+def stream_pieces(content: str) -> list:
+    return [content[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(content), STREAM_CHUNK_CHARS)]
+
+
+def stub_embedding(text: str, dim: int = STUB_EMBEDDING_DIM) -> list:
+    seed = int.from_bytes(hashlib.sha256(text.encode("utf-8")).digest()[:8], "little")
+    vector = np.random.default_rng(seed).standard_normal(dim).astype("float32")
+    return (vector / np.linalg.norm(vector)).tolist()
+
+
+class _StubEmbeddings:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def create(self, model, input, **kwargs):
+        self.calls += 1
+        time.sleep(self.latency)
+        items = [input] if isinstance(input, str) else input
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=stub_embedding(text))
+            for i, text in enumerate(items)
+        ])
+
+
+class _StubChatCompletions:
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self._seen_flaky = set()
+
+    def create(self, model, messages, stream=False, **kwargs):
+        self.calls += 1
+        try:
+            content, finish_reason = stub_chat_output(messages[-1]["content"], self._seen_flaky)
+        except RuntimeError:
+            time.sleep(self.latency)
+            raise
+
+        if stream:
+            return self._stream(content, finish_reason)
+
+        time.sleep(self.latency)
+        return SimpleNamespace(choices=[
+            SimpleNamespace(message=SimpleNamespace(content=content), finish_reason=finish_reason)
+        ])
+
+    def _stream(self, content, finish_reason):
+        """Spreads the latency evenly over the chunks, like token-by-token generation."""
+        pieces = stream_pieces(content)
+        for i, piece in enumerate(pieces):
+            time.sleep(self.latency / len(pieces))
+            last = i == len(pieces) - 1
+            yield SimpleNamespace(choices=[
+                SimpleNamespace(
+                    delta=SimpleNamespace(content=piece),
+                    finish_reason=finish_reason if last else None
+                )
+            ])
+
+
+class StubOpenAIClient:
+    def __init__(self, latency: float = 0.05):
+        self.embeddings = _StubEmbeddings(latency)
+        self.chat = SimpleNamespace(completions=_StubChatCompletions(latency))
+
+
+class StubAPIError(Exception):
+    """Carries an HTTP status like openai.APIStatusError, so retry logic can classify it."""
+
+    def __init__(self, status_code: int, message: str = "stub: simulated API error"):
+        super().__init__(message)
+        self.status_code = status_code
+        self.response = None
+
+
+class _AsyncStubEmbeddings:
+    def __init__(self, latency, fail_first, fail_status):
+        self.latency = latency
+        self.fail_first = fail_first
+        self.fail_status = fail_status
+        self.calls = 0
+
+    async def create(self, model, input, **kwargs):
+        self.calls += 1
+        call_number = self.calls
+        await asyncio.sleep(self.latency)
+        if call_number <= self.fail_first:
+            raise StubAPIError(self.fail_status)
+        items = [input] if isinstance(input, str) else input
+        return SimpleNamespace(data=[
+            SimpleNamespace(index=i, embedding=stub_embedding(text))
+            for i, text in enumerate(items)
+        ])
+
+
+class AsyncStubOpenAIClient:
+    """Async counterpart for AsyncOpenAI; the first `fail_first` embedding calls fail with `fail_status`."""
+
+    def __init__(self, latency: float = 0.05, fail_first: int = 0, fail_status: int = 429):
+        self.embeddings = _AsyncStubEmbeddings(latency, fail_first, fail_status)
+
+    async def close(self):
+        pass
+
+
+# -------------------------------------------------
+# Async engine smoke run against the stub
+# -------------------------------------------------
+def run_engine_against_stub(num_claims: int = 40, concurrency: int = 8, latency: float = 0.05):
+    client = StubOpenAIClient(latency)
+    markers = ["", "", "", "[stub:markdown]", "[stub:truncated]", "[stub:schema]", "[stub:error]"]
+
+    claims = [
+        {
+            "claim_id": f"stub_claim_{i:04d}",
+            "claim_text": f"Claim {i} {markers[i % len(markers)]}",
+            "clauses": [{"source_file": "ICICI Lombard.pdf", "text": "Cataract surgery is covered after a waiting period."}]
+        }
+        for i in range(num_claims)
+    ]
+
+    def reason_fn(claim_text, clauses):
+        response = client.chat.completions.create(
+            model="stub",
+            messages=[{"role": "user", "content": build_prompt(claim_text, clauses)}]
+        )
+        return response.choices[0].message.content
+
+    return process_claims(claims, reason_fn, concurrency=concurrency)
+
+
+if __name__ == "__main__":
+    for concurrency in (1, 8):
+        results, report = run_engine_against_stub(concurrency=concurrency)
+        in_order = [r["claim_id"] for r in results] == sorted(r["claim_id"] for r in results)
+        print(f"{report.summary()} | order preserved: {in_order}")
@@ -0,0 +1,134 @@
+import sys
+import json
+import time
+import base64
+import asyncio
+from pathlib import Path
+
+import numpy as np
+
+# -------------------------------------------------
+# Project path setup
+# -------------------------------------------------
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+sys.path.append(str(PROJECT_ROOT))
+sys.path.append(str(Path(__file__).resolve().parent))
+
+from stub_openai import stub_chat_output, stub_embedding, stream_pieces
+from src.serving.http_server import HTTPServer, Response, json_response
+
+# -------------------------------------------------
+# OpenAI-compatible HTTP stub
+# -------------------------------------------------
+# Serves /v1/chat/completions (plain and streamed) and /v1/embeddings
+# with the same scripted outputs as StubOpenAIClient, so the claims API
+# (scripts/serve_claims_api.py) can be run end to end through the real
+# openai client:
+#
+#   python tests/ai_validation/stub_openai_server.py
+#   OPENAI_BASE_URL=http://127.0.0.1:8099/v1 OPENAI_API_KEY=stub python scripts/serve_claims_api.py
+#   python tests/ai_validation/service_load_test.py
+#
+# The index has to be built with the same embedding backend the service
+# queries with (EMBEDDING_BACKEND=hashing needs no embedding calls at all).
+# -------------------------------------------------
+HOST = "127.0.0.1"
+PORT = 8099
+
+# Simulated generation time per chat completion, spread over the streamed chunks
+LATENCY_SECONDS = 0.2
+
+
+class StubOpenAIServer:
+    def __init__(self, latency: float = LATENCY_SECONDS):
+        self.latency = latency
+        self.chat_calls = 0
+        self.embedding_calls = 0
+        self._seen_flaky = set()
+        self.server = HTTPServer({
+            ("POST", "/v1/chat/completions"): self.chat_completions,
+            ("POST", "/v1/embeddings"): self.embeddings,
+        })
+
+    async def chat_completions(self, request):
+        self.chat_calls += 1
+        body = request.json()
+        model = body.get("model", "stub")
+
+        try:
+            content, finish_reason = stub_chat_output(body["messages"][-1]["content"], self._seen_flaky)
+        except RuntimeError as e:
+            await asyncio.sleep(self.latency)
+            return json_response({"error": {"message": str(e), "type": "server_error"}}, 500)
+
+        completion_id = f"chatcmpl-stub{self.chat_calls}"
+        created = int(time.time())
+
+        if body.get("stream"):
+            return Response(
+                body=self._stream(completion_id, created, model, content, finish_reason),
+                content_type="text/event-stream"
+            )
+
+        await asyncio.sleep(self.latency)
+        return json_response({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": finish_reason
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0}
+        })
+
+    async def _stream(self, completion_id, created, model, content, finish_reason):
+        pieces = stream_pieces(content)
+        for i, piece in enumerate(pieces):
+            await asyncio.sleep(self.latency / len(pieces))
+            chunk = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": piece},
+                    "finish_reason": finish_reason if i == len(pieces) - 1 else None
+                }]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n".encode("utf-8")
+        yield b"data: [DONE]\n\n"
+
+    async def embeddings(self, request):
+        self.embedding_calls += 1
+        body = request.json()
+        items = [body["input"]] if isinstance(body["input"], str) else body["input"]
+
+        data = []
+        for i, text in enumerate(items):
+            embedding = stub_embedding(text)
+            if body.get("encoding_format") == "base64":
+                embedding = base64.b64encode(np.asarray(embedding, dtype="float32").tobytes()).decode("ascii")
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+
+        return json_response({
+            "object": "list",
+            "data": data,
+            "model": body.get("model", "stub"),
+            "usage": {"prompt_tokens": 0, "total_tokens": 0}
+        })
+
+    async def serve(self, host=HOST, port=PORT):
+        await self.server.start(host, port)
+        print(f"Stub OpenAI API listening on http://{host}:{self.server.port}/v1")
+        await self.server.serve_forever()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(StubOpenAIServer().serve())
+    except KeyboardInterrupt:
+        pass